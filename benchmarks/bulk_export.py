@@ -0,0 +1,85 @@
+"""Bulk analytics export throughput in rows/sec for each output format.
+
+Fills a throwaway database with health logs, triage results, chat
+messages and streak days for many users, then runs export_all() once per
+format and batch size and reports rows/sec and output size.
+
+    python benchmarks/bulk_export.py [--rows 200000] [--batch-sizes 1000 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_export import EXPORT_FORMATS, EXPORT_TABLES, export_all, pa
+from db_connection import configure_database, get_connection
+from models import init_database
+
+
+def populate(rows, users=100):
+    random.seed(0)
+    start = date.today() - timedelta(days=rows // users)
+    with get_connection() as conn:
+        conn.executemany(
+            '''INSERT INTO health_logs (user_id, date, symptoms, severity_score, notes, created_at)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            ((i % users + 1, (start + timedelta(days=i // users)).isoformat(),
+              random.choice(["headache", "cough and mild fever", "fatigue", "feeling fine"]),
+              random.randint(0, 100), "", f"{start + timedelta(days=i // users)}T08:00:00")
+             for i in range(rows)))
+        conn.executemany(
+            '''INSERT OR IGNORE INTO daily_streaks (user_id, date, completed, created_at)
+               VALUES (?, ?, 1, ?)''',
+            ((i % users + 1, (start + timedelta(days=i // users)).isoformat(),
+              f"{start + timedelta(days=i // users)}T08:00:00") for i in range(rows)))
+        conn.executemany(
+            '''INSERT INTO triage_results (user_id, symptoms, triage_level, confidence, reasoning,
+                                           recommended_action, detailed_analysis, created_at)
+               VALUES (?, 'sore throat', 'self-monitor', 'medium', 'Mild symptoms', 'Rest', '', ?)''',
+            ((i % users + 1, f"{start}T09:00:00") for i in range(rows // 4)))
+        conn.executemany(
+            "INSERT INTO chat_sessions (user_id, session_type, created_at) VALUES (?, 'health_assistant', ?)",
+            ((user, f"{start}T10:00:00") for user in range(1, users + 1)))
+        conn.executemany(
+            '''INSERT INTO chat_messages (session_id, role, content, timestamp)
+               VALUES (?, ?, ?, ?)''',
+            ((i % users + 1, "user" if i % 2 else "assistant",
+              "How much water should I drink when I have a fever?", f"{start}T10:00:{i % 60:02d}")
+             for i in range(rows // 2)))
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Health log rows (other tables scale from it)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_database(os.path.join(tmp, "bench.db"))
+        init_database()
+        populate(args.rows)
+
+        formats = [f for f in EXPORT_FORMATS if f == 'ndjson' or pa is not None]
+        for export_format in formats:
+            for batch_size in args.batch_sizes:
+                output = os.path.join(tmp, f"{export_format}-{batch_size}")
+                start = time.perf_counter()
+                summary = export_all(output, export_format, batch_size)
+                elapsed = time.perf_counter() - start
+                total = sum(summary[table]['rows'] for table in EXPORT_TABLES)
+                print(f"{export_format:<8} batch {batch_size:>6}   {total:>8} rows   "
+                      f"{total / elapsed:>10,.0f} rows/sec   {directory_size(output) / 1024 / 1024:7.1f}MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Health Trends figure size and build time with and without downsampling.
+
+Builds create_health_trends_chart() from synthetic daily severity
+aggregates (a random walk with occasional spikes) and reports figure
+construction time, JSON serialization time and payload size for the full
+series and for each downsampling target. Also checks that the highest
+spike in the series survives downsampling.
+
+    python benchmarks/chart_downsampling.py [--days 20000] [--targets 500 1000 2000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from visualization import create_health_trends_chart
+
+
+def synthetic_aggregates(days):
+    rng = np.random.default_rng(0)
+    walk = np.clip(50 + np.cumsum(rng.normal(0, 2, days)), 0, 100)
+    spikes = rng.random(days) < 0.002
+    walk[spikes] = 100
+    counts = rng.integers(1, 4, days)
+    start = date.today() - timedelta(days=days)
+    return {
+        'date': [(start + timedelta(days=i)).isoformat() for i in range(days)],
+        'log_count': counts.tolist(),
+        'score_count': counts.tolist(),
+        'score_sum': (walk * counts).tolist(),
+        'score_min': np.floor(walk).astype(int).tolist(),
+        'score_max': np.ceil(walk).astype(int).tolist(),
+    }
+
+
+def measure(label, aggregates, max_points, repeat):
+    build, serialize = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig = create_health_trends_chart(aggregates, max_points=max_points)
+        build.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        payload = fig.to_json()
+        serialize.append(time.perf_counter() - start)
+
+    points = len(fig.data[0].y)
+    peak_kept = np.nanmax(np.asarray(fig.data[0].y, dtype=float)) == 100
+    print(f"{label:<14} {points:>7} points   build {min(build) * 1000:8.1f}ms   "
+          f"to_json {min(serialize) * 1000:8.1f}ms   payload {len(payload) / 1024:9.1f}KiB   "
+          f"peak kept: {'yes' if peak_kept else 'NO'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=20_000)
+    parser.add_argument("--targets", type=int, nargs="+", default=[500, 1000, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    aggregates = synthetic_aggregates(args.days)
+    print(f"{args.days} daily buckets")
+
+    measure("full series", aggregates, 0, args.repeat)
+    for target in args.targets:
+        measure(f"max {target}", aggregates, target, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Micro-benchmarks for every database.py read and write function at several data scales.
+
+For each scale (approximate number of health_logs rows) a throwaway
+database is seeded with synthetic_data.generate_synthetic_data() and
+every function is timed against the user with the longest history.
+Results (min/median/mean/p95 in ms per call) are written as JSON, and
+--compare prints the ratio of each median to an earlier results file.
+
+    python benchmarks/db_suite.py [--scales 1000 100000 10000000] [--repeat 20]
+                                  [--output results.json] [--compare earlier.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database as db
+from db_connection import configure_database
+from models import init_database
+from synthetic_data import SYNTHETIC_PASSWORD, generate_synthetic_data
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Full rebuilds and account functions (bcrypt) are too slow to repeat as often
+_SLOW = {'rebuild_streak_summaries', 'rebuild_severity_aggregates', 'create_user', 'authenticate_user'}
+
+
+def scale_shape(rows):
+    """Users, days of history and chat messages per session for about `rows` health logs"""
+    days = min(3650, rows)
+    users = max(1, round(rows / days))
+    messages = min(2000, max(20, rows // (users * 20)))
+    return users, days, messages
+
+
+def benchmarks(user_id, session_id):
+    """(function name, zero-argument callable) for every public database.py function"""
+    today = date.today().isoformat()
+    month_ago = (date.today() - timedelta(days=30)).isoformat()
+    year_ago = (date.today() - timedelta(days=365)).isoformat()
+    log_cursor = db.get_health_logs_page(user_id, 30)[1]
+    triage_cursor = db.get_triage_history_page(user_id, 10)[1]
+    chat_cursor = db.get_chat_history_page(session_id, 50)[1]
+    counter = iter(range(10 ** 9))
+
+    def add_then_delete():
+        db.add_health_log(user_id, "benchmark symptoms", "", 40)
+        start = time.perf_counter()
+        db.delete_daily_checkin(user_id, today)
+        return time.perf_counter() - start
+
+    return [
+        ('get_data_version', lambda: db.get_data_version(user_id)),
+        ('create_user', lambda: db.create_user(f"bench{next(counter)}@example.com", "pw", "Bench")),
+        ('authenticate_user', lambda: db.authenticate_user(f"synthetic{user_id}@example.com", SYNTHETIC_PASSWORD)),
+        ('update_user_profile', lambda: db.update_user_profile(user_id, {'full_name': 'Bench', 'weight': 70})),
+        ('get_user_profile', lambda: db.get_user_profile(user_id)),
+        ('add_health_log', lambda: db.add_health_log(user_id, "benchmark symptoms", "", 40)),
+        ('delete_daily_checkin', add_then_delete),
+        ('get_health_logs', lambda: db.get_health_logs(user_id, 30)),
+        ('get_health_logs_columnar', lambda: db.get_health_logs(user_id, 30, columnar=True)),
+        ('get_health_logs_between_30d', lambda: db.get_health_logs_between(user_id, month_ago)),
+        ('get_health_logs_between_1y', lambda: db.get_health_logs_between(user_id, year_ago)),
+        ('get_health_logs_between_all', lambda: db.get_health_logs_between(user_id)),
+        ('get_health_logs_page', lambda: db.get_health_logs_page(user_id, 30, log_cursor)),
+        ('iter_health_logs_all', lambda: sum(1 for _ in db.iter_health_logs(user_id))),
+        ('add_triage_result', lambda: db.add_triage_result(user_id, "cough", "self-monitor", "Low",
+                                                           "r", "a", "d")),
+        ('get_triage_history', lambda: db.get_triage_history(user_id, 10)),
+        ('get_triage_history_between_1y', lambda: db.get_triage_history_between(user_id, year_ago)),
+        ('get_triage_history_page', lambda: db.get_triage_history_page(user_id, 10, triage_cursor)),
+        ('iter_triage_history_all', lambda: sum(1 for _ in db.iter_triage_history(user_id))),
+        ('get_streak_data', lambda: db.get_streak_data(user_id)),
+        ('get_daily_severity_aggregates_1y', lambda: db.get_daily_severity_aggregates(user_id, year_ago)),
+        ('get_hourly_severity_aggregates', lambda: db.get_hourly_severity_aggregates(user_id)),
+        ('create_chat_session', lambda: db.create_chat_session(user_id)),
+        ('add_chat_message', lambda: db.add_chat_message(session_id, "user", "benchmark message")),
+        ('get_chat_history', lambda: db.get_chat_history(session_id)),
+        ('get_chat_history_page', lambda: db.get_chat_history_page(session_id, 50)),
+        ('get_chat_history_page_older', lambda: db.get_chat_history_page(session_id, 50, chat_cursor)),
+        ('iter_chat_history', lambda: sum(1 for _ in db.iter_chat_history(session_id))),
+        ('rebuild_streak_summaries_user', lambda: db.rebuild_streak_summaries(user_id)),
+        ('rebuild_streak_summaries', lambda: db.rebuild_streak_summaries()),
+        ('rebuild_severity_aggregates', lambda: db.rebuild_severity_aggregates()),
+    ]
+
+
+def time_call(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        measured = fn()
+        elapsed = time.perf_counter() - start
+        # A benchmark may time only part of its work and return that duration
+        timings.append(measured if isinstance(measured, float) else elapsed)
+    timings.sort()
+    return {
+        'calls': repeat,
+        'min_ms': round(timings[0] * 1000, 4),
+        'median_ms': round(statistics.median(timings) * 1000, 4),
+        'mean_ms': round(statistics.fmean(timings) * 1000, 4),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 4),
+    }
+
+
+def run_scale(rows, repeat, tmp):
+    users, days, messages = scale_shape(rows)
+    configure_database(os.path.join(tmp, f"scale_{rows}.db"))
+    init_database()
+
+    started = time.perf_counter()
+    counts = generate_synthetic_data(users, days, messages_per_session=messages, seed=rows)
+    seed_seconds = time.perf_counter() - started
+    print(f"\nscale {rows}: {counts} (seeded in {seed_seconds:.1f}s)")
+
+    with db.get_connection() as conn:
+        user_id = conn.execute('''SELECT user_id FROM health_logs GROUP BY user_id
+                                  ORDER BY COUNT(*) DESC LIMIT 1''').fetchone()[0]
+        session_id = conn.execute('''SELECT s.id FROM chat_sessions s JOIN chat_messages m ON m.session_id = s.id
+                                     WHERE s.user_id = ? GROUP BY s.id ORDER BY COUNT(*) DESC LIMIT 1''',
+                                  (user_id,)).fetchone()[0]
+
+    results = {}
+    for name, fn in benchmarks(user_id, session_id):
+        fn()  # warm up caches and the connection pool
+        base_name = name.rsplit('_user', 1)[0]
+        results[name] = time_call(fn, max(3, repeat // 5) if base_name in _SLOW else repeat)
+        print(f"  {name:<36} median {results[name]['median_ms']:>10.3f}ms   p95 {results[name]['p95_ms']:>10.3f}ms")
+
+    return {'rows': counts, 'users': users, 'days': days, 'seed_seconds': round(seed_seconds, 2),
+            'functions': results}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous_path):
+    with open(previous_path, encoding='utf-8') as f:
+        previous = json.load(f)
+    print(f"\nmedian vs. {previous_path} ({previous['meta'].get('revision')}):")
+    for scale, result in current['scales'].items():
+        before = previous['scales'].get(scale)
+        if not before:
+            continue
+        print(f"scale {scale}")
+        for name, stats in result['functions'].items():
+            old = before['functions'].get(name)
+            if old and old['median_ms']:
+                print(f"  {name:<36} {stats['median_ms'] / old['median_ms']:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 100_000],
+                        help="Approximate health_logs rows per run (e.g. 1000 100000 10000000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per function (fewer for slow ones)")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/db_suite-<revision>-<time>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare medians against")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    report = {
+        'meta': {
+            'revision': revision,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'scales': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.scales:
+            report['scales'][str(rows)] = run_scale(rows, args.repeat, tmp)
+
+    output = args.output or os.path.join(
+        REPO_ROOT, "benchmarks", "results",
+        f"db_suite-{revision or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Accuracy and latency of the offline language detector.
+
+Runs detect_language_local over the bundled multilingual sample set and
+reports accuracy, per-call latency and how many inputs would still fall
+back to the model at the configured confidence threshold. With
+--with-model the same samples are also sent to Gemini so the latency saved
+can be weighed against the accuracy lost.
+
+    python benchmarks/language_detection.py [--repeat 200] [--with-model]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from statistics import mean, median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import LANGUAGE_DETECTION_MIN_CONFIDENCE
+from language_detection import detect_language_local
+
+SAMPLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "language_samples.json")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def bench_local(samples, repeat):
+    timings = []
+    correct = 0
+    fallbacks = 0
+    misses = []
+    for sample in samples:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            language, confidence = detect_language_local(sample["text"])
+        timings.append((time.perf_counter() - start) / repeat * 1e6)
+
+        if language == sample["language"]:
+            correct += 1
+        else:
+            misses.append((sample["language"], language, confidence, sample["text"][:50]))
+        if confidence < LANGUAGE_DETECTION_MIN_CONFIDENCE:
+            fallbacks += 1
+
+    return {
+        "samples": len(samples),
+        "accuracy": round(correct / len(samples), 4),
+        "fallback_rate": round(fallbacks / len(samples), 4),
+        "mean_us": round(mean(timings), 1),
+        "p50_us": round(median(timings), 1),
+        "p99_us": round(percentile(timings, 99), 1),
+        "misses": misses,
+    }
+
+
+def bench_model(samples):
+    from gemini_client import run_sync, _detect_language_with_model
+
+    timings = []
+    correct = 0
+    for sample in samples:
+        start = time.perf_counter()
+        language = run_sync(_detect_language_with_model(sample["text"]))
+        timings.append((time.perf_counter() - start) * 1000)
+        correct += language == sample["language"]
+
+    return {
+        "samples": len(samples),
+        "accuracy": round(correct / len(samples), 4),
+        "mean_ms": round(mean(timings), 1),
+        "p50_ms": round(median(timings), 1),
+        "p99_ms": round(percentile(timings, 99), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="Timing iterations per sample")
+    parser.add_argument("--with-model", action="store_true", help="Also measure the Gemini round-trip")
+    args = parser.parse_args()
+
+    with open(SAMPLES_PATH, encoding="utf-8") as f:
+        samples = json.load(f)
+
+    local = bench_local(samples, args.repeat)
+    print(f"Local detector: {local['accuracy']:.1%} accurate on {local['samples']} samples, "
+          f"{local['fallback_rate']:.1%} below confidence {LANGUAGE_DETECTION_MIN_CONFIDENCE}")
+    print(f"  latency mean {local['mean_us']}us  p50 {local['p50_us']}us  p99 {local['p99_us']}us")
+    for expected, got, confidence, text in local["misses"]:
+        print(f"  miss: expected {expected}, got {got} ({confidence}) {text!r}")
+
+    if args.with_model:
+        model = bench_model(samples)
+        print(f"Gemini: {model['accuracy']:.1%} accurate, "
+              f"latency mean {model['mean_ms']}ms  p50 {model['p50_ms']}ms  p99 {model['p99_ms']}ms")
+        saved = model["mean_ms"] * 1000 - local["mean_us"]
+        print(f"Saved per detection: ~{saved / 1000:.1f}ms, "
+              f"accuracy change {local['accuracy'] - model['accuracy']:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
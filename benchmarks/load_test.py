@@ -0,0 +1,194 @@
+"""End-to-end load test of the check-in, triage, chat and report flows.
+
+Runs N simulated users as threads against a throwaway database and the
+in-process fake Gemini backend (GEMINI_BACKEND=fake unless set
+otherwise). Each user repeatedly picks a flow and performs the same
+database.py and gemini_client.py calls as the corresponding Streamlit
+page. The script reports throughput and p50/p95/p99 latency per flow,
+followed by the Gemini client's cache, coalescing and throttling
+counters. A flow that got a fallback reply instead of a model answer
+(including every call rejected by the open circuit breaker) counts as
+an error.
+
+The fake replaces the model object, so the genai transport and its
+request/response serialization are not exercised. The app only uses
+generate_content_async, and with transport="rest" (the one transport
+that could point at a local HTTP stand-in) the installed client returns
+non-awaitable responses from it, so a REST fake can't drive these
+flows. Symptoms come from a small vocabulary, so many repeats are cache
+hits; pass --no-cache to measure every call going to the model.
+
+    python benchmarks/load_test.py [--users 20] [--duration 30] [--flows checkin triage chat]
+                                   [--latency-scale 1.0] [--error-rate 0.0] [--rpm 6000] [--no-cache]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SYMPTOMS = ["headache", "sore throat", "mild fever", "dry cough", "fatigue", "runny nose",
+            "stomach ache", "back pain", "dizziness", "nausea"]
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    parser.add_argument("--flows", nargs="+", default=["checkin", "triage", "chat"],
+                        choices=["checkin", "triage", "chat", "report"])
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier for fake model latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Injected 429/503 rate per model call")
+    parser.add_argument("--rpm", type=float, default=6000, help="Client-side Gemini request limit per minute")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the Gemini response cache")
+    args = parser.parse_args()
+
+    # Must be set before gemini_client reads its configuration
+    os.environ.setdefault("GEMINI_BACKEND", "fake")
+    os.environ["FAKE_GEMINI_LATENCY_SCALE"] = str(args.latency_scale)
+    os.environ["FAKE_GEMINI_ERROR_RATE"] = str(args.error_rate)
+    os.environ["FAKE_GEMINI_SEED"] = str(args.seed)
+    os.environ["GEMINI_REQUESTS_PER_MINUTE"] = str(args.rpm)
+    if args.no_cache:
+        os.environ["GEMINI_CACHE_MAX_ENTRIES"] = "0"
+        os.environ["GEMINI_CACHE_DB_PATH"] = ""
+
+    from db_connection import configure_database
+    from models import init_database
+    from database import (
+        create_user, add_health_log, delete_daily_checkin, get_health_logs, get_streak_data,
+        add_triage_result, create_chat_session, add_chat_message, get_chat_history_page
+    )
+    from gemini_client import (
+        analyze_checkin, detect_language, generate_chat_response_stream,
+        get_cache_stats, get_coalescing_stats, get_throttle_stats,
+        ANALYSIS_ERROR_REASONING, CHAT_ERROR_MESSAGE, REPORT_ERROR_MESSAGE
+    )
+    from report_generator import generate_pdf_report
+    from config import CHAT_PAGE_SIZE
+
+    class FallbackReply(Exception):
+        """The model call failed and the app showed its fallback reply"""
+
+    def analyze(symptoms):
+        assessment = analyze_checkin(symptoms)
+        if assessment['reasoning'] == ANALYSIS_ERROR_REASONING:
+            raise FallbackReply("analyze_checkin returned its fallback")
+        return assessment
+
+    def checkin_flow(user):
+        today = date.today().isoformat()
+        logs = get_health_logs(user['id'], 1)
+        if logs and logs[0]['date'] == today:
+            delete_daily_checkin(user['id'], today)
+        symptoms = user['symptoms']()
+        severity_score = analyze(symptoms)['severity_score']
+        add_health_log(user['id'], symptoms, "", severity_score)
+        get_streak_data(user['id'])
+
+    def triage_flow(user):
+        symptoms = user['symptoms']()
+        assessment = analyze(symptoms)
+        add_triage_result(user['id'], symptoms, assessment['triage_level'], assessment['confidence'],
+                          assessment['reasoning'], assessment['recommended_action'],
+                          assessment.get('detailed_analysis', ''))
+
+    def chat_flow(user):
+        if user['session'] is None:
+            user['session'] = create_chat_session(user['id'])
+        get_chat_history_page(user['session'], CHAT_PAGE_SIZE)
+        message = f"What should I do about my {user['symptoms']()}?"
+        add_chat_message(user['session'], "user", message)
+        chat_history, _ = get_chat_history_page(user['session'], 3)
+        language = detect_language(message)
+        response = "".join(generate_chat_response_stream(message, chat_history, language))
+        if response == CHAT_ERROR_MESSAGE:
+            raise FallbackReply("chat stream returned its fallback")
+        add_chat_message(user['session'], "assistant", response.strip())
+
+    def report_flow(user):
+        end = date.today()
+        report = generate_pdf_report(user['id'], (end - timedelta(days=30)).isoformat(), end.isoformat())
+        # Found in HTML and text-backend PDFs (wkhtmltopdf compresses its text)
+        marker = REPORT_ERROR_MESSAGE if isinstance(report, str) else REPORT_ERROR_MESSAGE.encode()
+        if marker in report:
+            raise FallbackReply("report summary is the fallback text")
+
+    flows = {'checkin': checkin_flow, 'triage': triage_flow, 'chat': chat_flow, 'report': report_flow}
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+
+    def run_user(user, rng, deadline):
+        while time.monotonic() < deadline:
+            name = rng.choice(args.flows)
+            start = time.perf_counter()
+            try:
+                flows[name](user)
+            except Exception as e:
+                with lock:
+                    errors[name] += 1
+                print(f"{name} flow failed: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[name].append(elapsed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_database(os.path.join(tmp, "load.db"))
+        init_database()
+
+        # Accounts are created up front: password hashing is deliberately slow
+        users = []
+        for index in range(args.users):
+            rng = random.Random(args.seed * 1000 + index)
+            users.append(({
+                'id': create_user(f"load{index}@example.com", "password", f"Load User {index}"),
+                'session': None,
+                'symptoms': lambda rng=rng: " and ".join(rng.sample(SYMPTOMS, rng.randint(1, 3))),
+            }, rng))
+
+        started = time.monotonic()
+        deadline = started + args.duration
+        threads = [threading.Thread(target=run_user, args=(user, rng, deadline)) for user, rng in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.monotonic() - started
+
+    print(f"\n{args.users} users, {wall:.1f}s, latency scale {args.latency_scale}, "
+          f"error rate {args.error_rate}, cache {'off' if args.no_cache else 'on'}")
+    print(f"{'flow':<10}{'count':>8}{'errors':>8}{'per sec':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    everything = []
+    for name in args.flows:
+        ordered = sorted(latencies[name])
+        everything.extend(ordered)
+        print(f"{name:<10}{len(ordered):>8}{errors[name]:>8}{len(ordered) / wall:>10.1f}"
+              f"{percentile(ordered, 50) * 1000:>10.0f}{percentile(ordered, 95) * 1000:>10.0f}"
+              f"{percentile(ordered, 99) * 1000:>10.0f}")
+    everything.sort()
+    print(f"{'all':<10}{len(everything):>8}{sum(errors.values()):>8}{len(everything) / wall:>10.1f}"
+          f"{percentile(everything, 50) * 1000:>10.0f}{percentile(everything, 95) * 1000:>10.0f}"
+          f"{percentile(everything, 99) * 1000:>10.0f}")
+
+    print(f"\ncache: {get_cache_stats()}")
+    print(f"coalescing: {get_coalescing_stats()}")
+    print(f"throttling: {get_throttle_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Report HTML render cost: precompiled templates vs. f-string concatenation.
+
+Renders a medical report listing N health logs and N/4 triage results
+with render_report_html() and with the f-string `+=` loop that
+generate_pdf_report() used to build its HTML inline, both without
+escaping (as it was) and with html.escape() on every cell (the fair
+baseline, since the templates escape). Reports the best time and the
+output size for each N.
+
+    python benchmarks/report_rendering.py [--logs 1000 5000 20000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from html import escape
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_templates import render_report_html
+
+PROFILE = {
+    'full_name': 'Alex Doe', 'date_of_birth': '1990-04-01', 'blood_group': 'O+',
+    'height': 175, 'weight': 70, 'allergies': 'Penicillin', 'medications': None,
+    'chronic_conditions': 'Asthma',
+}
+SUMMARY = "Overall the patient reports mild, improving symptoms.\n" * 20
+
+
+def sample_rows(count):
+    random.seed(0)
+    start = date.today() - timedelta(days=count)
+    logs = [{
+        'date': (start + timedelta(days=i)).isoformat(),
+        'symptoms': random.choice(["headache & \"pressure\"", "cough <mild>", "fatigue", "feeling fine"]),
+        'severity_score': random.randint(0, 100),
+    } for i in range(count)]
+    triage = [{
+        'created_at': f"{start + timedelta(days=i)}T09:00:00",
+        'symptoms': 'sore throat',
+        'triage_level': 'self-monitor',
+        'confidence': 'medium',
+    } for i in range(count // 4)]
+    return logs, triage
+
+
+def legacy_render(logs, triage, esc=str):
+    """The previous inline f-string implementation (abridged head, same loop shape)
+
+    esc is applied to every value (str: no escaping, as before).
+    """
+    html = f"""
+    <!DOCTYPE html><html><head><meta charset="UTF-8"><style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; margin: 40px; }}
+        .section-title {{ font-weight: bold; font-size: 18px; border-bottom: 2px solid #333; }}
+    </style></head><body>
+        <p>Name: {PROFILE.get('full_name', 'Not provided')}</p>
+        <div class="summary-box">{SUMMARY.replace(chr(10), '<br>')}</div>
+        <div class="section-title">Recent Health Logs ({len(logs)} entries)</div><ul>
+    """
+    for log in logs:
+        html += f"""
+                <li>
+                    <strong>{esc(log['date'])}:</strong> {esc(log['symptoms'])} 
+                    (Severity: {esc(str(log.get('severity_score', 'N/A')))}/100)
+                </li>
+        """
+    html += """</ul><div class="section-title">Recent Triage Assessments</div><ul>"""
+    for item in triage:
+        html += f"""
+                <li>
+                    <strong>{esc(item['created_at'][:10])}:</strong> {esc(item['symptoms'])} 
+                    -> {esc(item['triage_level'])} ({esc(item['confidence'])} confidence)
+                </li>
+        """
+    html += "</ul></body></html>"
+    return html
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, nargs="+", default=[10, 1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for count in args.logs:
+        logs, triage = sample_rows(count)
+        legacy_time, legacy_html = best_of(lambda: legacy_render(logs, triage), args.repeat)
+        escaped_time, _ = best_of(lambda: legacy_render(logs, triage, escape), args.repeat)
+        compiled_time, compiled_html = best_of(
+            lambda: render_report_html(PROFILE, SUMMARY, logs, triage, "2024-01-01", "2024-12-31",
+                                       "2024-12-31 12:00"), args.repeat)
+        print(f"{count:>6} logs   f-string {legacy_time * 1000:8.2f}ms ({len(legacy_html) / 1024:7.1f}KiB)   "
+              f"f-string+escape {escaped_time * 1000:8.2f}ms   "
+              f"compiled {compiled_time * 1000:8.2f}ms ({len(compiled_html) / 1024:7.1f}KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Row dicts vs. columnar results for large health histories.
+
+Fills a throwaway database with one user's health logs, then times
+get_health_logs_between() in both result modes, with and without the
+pandas DataFrame conversion that the charts do, and records peak Python
+memory for each path.
+
+    python benchmarks/row_formats.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from db_connection import configure_database, get_connection
+from models import init_database
+from database import get_health_logs_between
+
+
+def populate(rows):
+    random.seed(0)
+    start = date.today() - timedelta(days=rows)
+    with get_connection() as conn:
+        conn.executemany(
+            '''INSERT INTO health_logs (user_id, date, symptoms, severity_score, notes, created_at)
+               VALUES (1, ?, ?, ?, ?, ?)''',
+            ((
+                (start + timedelta(days=i)).isoformat(),
+                random.choice(["headache", "cough and mild fever", "fatigue", "feeling fine"]),
+                random.randint(0, 100),
+                "",
+                datetime.combine(start + timedelta(days=i), datetime.min.time()).isoformat(),
+            ) for i in range(rows))
+        )
+
+
+def measure(label, fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<28} best {min(timings) * 1000:8.1f}ms   peak {peak / 1024 / 1024:7.1f}MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_database(os.path.join(tmp, "bench.db"))
+        init_database()
+        populate(args.rows)
+        print(f"{args.rows} health log rows")
+
+        measure("row dicts", lambda: get_health_logs_between(1), args.repeat)
+        measure("columnar", lambda: get_health_logs_between(1, columnar=True), args.repeat)
+        measure("row dicts -> DataFrame",
+                lambda: pd.DataFrame(get_health_logs_between(1)), args.repeat)
+        measure("columnar -> DataFrame",
+                lambda: pd.DataFrame(get_health_logs_between(1, columnar=True)), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
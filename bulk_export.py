@@ -0,0 +1,146 @@
+import gzip
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+from config import EXPORT_BATCH_SIZE, EXPORT_ROWS_PER_FILE
+from db_connection import get_dedicated_connection
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    # Without pyarrow only the gzip NDJSON format is available
+    pa = pa_ipc = pq = None
+
+# Tables included in the analytics export
+EXPORT_TABLES = ('health_logs', 'triage_results', 'chat_messages', 'daily_streaks')
+
+EXPORT_FORMATS = ('parquet', 'arrow', 'ndjson')
+
+_FILE_EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow', 'ndjson': 'ndjson.gz'}
+
+def default_export_format() -> str:
+    """Parquet when pyarrow is installed, gzip NDJSON otherwise"""
+    return 'parquet' if pa is not None else 'ndjson'
+
+def _arrow_type(declared_type: str):
+    """Arrow type for a column from its declared SQLite type (by SQLite's affinity rules)"""
+    declared_type = declared_type.upper()
+    if 'INT' in declared_type:
+        return pa.int64()
+    if any(name in declared_type for name in ('REAL', 'FLOA', 'DOUB')):
+        return pa.float64()
+    if 'BLOB' in declared_type:
+        return pa.binary()
+    return pa.string()
+
+def _table_columns(c, table: str) -> List[Tuple[str, str]]:
+    """(name, declared type) of each column of a table"""
+    c.execute(f'PRAGMA table_info({table})')
+    return [(row[1], row[2]) for row in c.fetchall()]
+
+def _iter_batches(c, table: str, columns: List[str], batch_size: int) -> Iterator[list]:
+    """Rows of a table in primary key order, batch_size rows at a time"""
+    c.execute(f'SELECT {", ".join(columns)} FROM {table} ORDER BY rowid')
+    while True:
+        rows = c.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+class _PartWriter:
+    """Writes one table's batches into numbered part files of at most rows_per_file rows"""
+
+    def __init__(self, directory: str, export_format: str, columns: List[Tuple[str, str]],
+                 rows_per_file: int):
+        self.directory = directory
+        self.export_format = export_format
+        self.names = [name for name, _ in columns]
+        self.rows_per_file = rows_per_file
+        self.schema = None
+        if export_format != 'ndjson':
+            self.schema = pa.schema([(name, _arrow_type(declared)) for name, declared in columns])
+        self.files = []
+        self._writer = None
+        self._rows_in_file = 0
+
+    def _open_part(self):
+        path = os.path.join(self.directory,
+                            f"part-{len(self.files):05d}.{_FILE_EXTENSIONS[self.export_format]}")
+        self.files.append(path)
+        if self.export_format == 'parquet':
+            self._writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+        elif self.export_format == 'arrow':
+            self._writer = pa_ipc.new_file(path, self.schema)
+        else:
+            self._writer = gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+        self._rows_in_file = 0
+
+    def _write(self, rows: list):
+        if self.export_format == 'ndjson':
+            self._writer.write(''.join(
+                json.dumps(dict(zip(self.names, row)), ensure_ascii=False) + '\n' for row in rows))
+        else:
+            columns = list(zip(*rows))
+            self._writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, self.schema)],
+                schema=self.schema))
+
+    def write(self, rows: list):
+        # Split a batch across part files when it crosses the size limit
+        while rows:
+            if self._writer is None or self._rows_in_file >= self.rows_per_file:
+                self.close()
+                self._open_part()
+            room = self.rows_per_file - self._rows_in_file
+            self._write(rows[:room])
+            self._rows_in_file += len(rows[:room])
+            rows = rows[room:]
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+def export_all(output_dir: str, export_format: str = None, batch_size: int = EXPORT_BATCH_SIZE,
+               rows_per_file: int = EXPORT_ROWS_PER_FILE) -> Dict[str, Dict[str, Any]]:
+    """Dump every user's rows of EXPORT_TABLES into output_dir/<table>/part-NNNNN.<ext>
+
+    All tables are read from one snapshot (a single read transaction), in
+    batches of batch_size rows, so memory stays bounded. Returns per-table
+    row counts, file lists and elapsed seconds.
+    """
+    export_format = export_format or default_export_format()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if export_format != 'ndjson' and pa is None:
+        raise RuntimeError(f"pyarrow is required for {export_format} export; use ndjson instead")
+
+    summary = {}
+    with get_dedicated_connection() as conn:
+        c = conn.cursor()
+        c.execute('BEGIN')
+        for table in EXPORT_TABLES:
+            started = time.perf_counter()
+            columns = _table_columns(c, table)
+            directory = os.path.join(output_dir, table)
+            os.makedirs(directory, exist_ok=True)
+
+            writer = _PartWriter(directory, export_format, columns, rows_per_file)
+            rows_written = 0
+            try:
+                for rows in _iter_batches(c, table, [name for name, _ in columns], batch_size):
+                    writer.write(rows)
+                    rows_written += len(rows)
+            finally:
+                writer.close()
+
+            summary[table] = {
+                'rows': rows_written,
+                'files': writer.files,
+                'seconds': time.perf_counter() - started,
+            }
+    return summary
@@ -5,7 +5,93 @@ load_dotenv()
 
 # Configuration constants
 AI_API_KEY = os.getenv("AI_API_KEY")
-DATABASE_PATH = "health_tracker.db"
+DATABASE_PATH = os.getenv("DATABASE_PATH", "health_tracker.db")
+
+# SQLite connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Health Assistant messages loaded per page
+CHAT_PAGE_SIZE = int(os.getenv("CHAT_PAGE_SIZE", "50"))
+
+# Rows per page of the raw health data table on the Health Trends page
+HEALTH_TABLE_PAGE_SIZE = int(os.getenv("HEALTH_TABLE_PAGE_SIZE", "100"))
+
+# Background PDF report jobs
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_JOB_RETENTION_DAYS = int(os.getenv("REPORT_JOB_RETENTION_DAYS", "7"))
+# A job still 'running' this long after it started is assumed to belong to a
+# dead process and is queued again (well above the slowest real report)
+REPORT_JOB_LEASE_SECONDS = int(os.getenv("REPORT_JOB_LEASE_SECONDS", "900"))
+
+# PDF rendering: backend is "auto" (wkhtmltopdf if installed, otherwise the
+# built-in text renderer), "wkhtmltopdf" or "text"
+PDF_BACKEND = os.getenv("PDF_BACKEND", "auto")
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+PDF_RENDER_QUEUE_SIZE = int(os.getenv("PDF_RENDER_QUEUE_SIZE", "16"))
+PDF_RENDER_TIMEOUT_SECONDS = float(os.getenv("PDF_RENDER_TIMEOUT_SECONDS", "60"))
+
+# Bulk analytics export (manage.py export-all): rows fetched per batch and
+# rows per output part file
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "10000"))
+EXPORT_ROWS_PER_FILE = int(os.getenv("EXPORT_ROWS_PER_FILE", "1000000"))
+
+# Model backend: "gemini" for the real API, "fake" for the in-process
+# stand-in in fake_gemini.py (load tests, offline development). The fake's
+# per-prompt-type latencies, error rates and replies can be overridden with
+# a JSON file; FAKE_GEMINI_ERROR_RATE overrides every type's error rate.
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "gemini")
+FAKE_GEMINI_PROFILE = os.getenv("FAKE_GEMINI_PROFILE", "")
+FAKE_GEMINI_ERROR_RATE = os.getenv("FAKE_GEMINI_ERROR_RATE", "")
+FAKE_GEMINI_LATENCY_SCALE = float(os.getenv("FAKE_GEMINI_LATENCY_SCALE", "1"))
+FAKE_GEMINI_SEED = os.getenv("FAKE_GEMINI_SEED", "")
+
+# Gemini request scheduling
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+# Longest a caller waits for one answer, including rate-limit waits and retries
+GEMINI_CALL_DEADLINE_SECONDS = float(os.getenv("GEMINI_CALL_DEADLINE_SECONDS", "60"))
+
+# Client-side Gemini quota: token bucket refilled at GEMINI_REQUESTS_PER_MINUTE
+# with bursts up to GEMINI_BURST, halved on 429s and recovered on success
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "300"))
+GEMINI_BURST = int(os.getenv("GEMINI_BURST", "20"))
+
+# Retries for 429/5xx/timeouts (jittered exponential backoff) and the
+# circuit breaker that fails fast after consecutive upstream failures
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+GEMINI_RETRY_BASE_SECONDS = float(os.getenv("GEMINI_RETRY_BASE_SECONDS", "0.5"))
+GEMINI_RETRY_MAX_SECONDS = float(os.getenv("GEMINI_RETRY_MAX_SECONDS", "8"))
+GEMINI_BREAKER_FAILURE_THRESHOLD = int(os.getenv("GEMINI_BREAKER_FAILURE_THRESHOLD", "5"))
+GEMINI_BREAKER_RESET_SECONDS = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+
+# Hedged triage requests (opt-in): if a triage call hasn't answered by the
+# GEMINI_HEDGE_PERCENTILE of recent latencies, send one backup request. At
+# most GEMINI_HEDGE_BUDGET (fraction of requests) are hedged; until enough
+# latencies are recorded the delay is GEMINI_HEDGE_WARMUP_DELAY_SECONDS.
+GEMINI_HEDGING_ENABLED = os.getenv("GEMINI_HEDGING_ENABLED", "false").lower() in ("1", "true", "yes")
+GEMINI_HEDGE_PERCENTILE = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "95"))
+GEMINI_HEDGE_BUDGET = float(os.getenv("GEMINI_HEDGE_BUDGET", "0.1"))
+GEMINI_HEDGE_WARMUP_DELAY_SECONDS = float(os.getenv("GEMINI_HEDGE_WARMUP_DELAY_SECONDS", "2"))
+
+# Gemini response cache (an empty DB path keeps the cache in memory only)
+GEMINI_CACHE_TTL_SECONDS = float(os.getenv("GEMINI_CACHE_TTL_SECONDS", "3600"))
+GEMINI_CACHE_MAX_ENTRIES = int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "1024"))
+GEMINI_CACHE_DB_PATH = os.getenv("GEMINI_CACHE_DB_PATH", "")
+GEMINI_CACHE_DB_MAX_ENTRIES = int(os.getenv("GEMINI_CACHE_DB_MAX_ENTRIES", "50000"))
+
+# Health Trends line chart is downsampled to at most this many points
+# (min/max per bucket, so severity peaks survive); 0 disables downsampling
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "1000"))
+
+# Built Health Trends figures kept in memory, keyed by user, chart, time
+# filter and data version
+FIGURE_CACHE_MAX_ENTRIES = int(os.getenv("FIGURE_CACHE_MAX_ENTRIES", "256"))
+
+# Local language detection answers on its own above this confidence (0-1);
+# below it the model is asked instead
+LANGUAGE_DETECTION_MIN_CONFIDENCE = float(os.getenv("LANGUAGE_DETECTION_MIN_CONFIDENCE", "0.2"))
 
 # Supported languages
 LANGUAGES = {
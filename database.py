@@ -1,77 +1,82 @@
 import sqlite3
+import base64
+import json
 import bcrypt
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+
+from db_connection import get_connection, get_dedicated_connection
+
+def _bump_data_version(c: sqlite3.Cursor, user_id: int) -> None:
+    """Mark a user's health data as changed (invalidates derived reports)"""
+    c.execute('''INSERT INTO user_data_versions (user_id, version) VALUES (?, 1)
+                 ON CONFLICT(user_id) DO UPDATE SET version = version + 1''', (user_id,))
+
+def get_data_version(user_id: int) -> int:
+    """Get the current data version for a user (0 if nothing was written yet)"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT version FROM user_data_versions WHERE user_id = ?', (user_id,))
+        row = c.fetchone()
+    return row[0] if row else 0
 
 def create_user(email: str, password: str, full_name: str) -> int:
     """Create a new user with hashed password"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
     # Hash password
     password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
     created_at = datetime.now().isoformat()
-    
-    try:
-        c.execute('''INSERT INTO users (email, password_hash, full_name, created_at, last_login)
-                     VALUES (?, ?, ?, ?, ?)''',
-                 (email, password_hash, full_name, created_at, created_at))
-        user_id = c.lastrowid
-        conn.commit()
-        return user_id
-    except sqlite3.IntegrityError:
-        return -1  # User already exists
-    finally:
-        conn.close()
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute('''INSERT INTO users (email, password_hash, full_name, created_at, last_login)
+                         VALUES (?, ?, ?, ?, ?)''',
+                     (email, password_hash, full_name, created_at, created_at))
+            return c.lastrowid
+        except sqlite3.IntegrityError:
+            return -1  # User already exists
 
 def authenticate_user(email: str, password: str) -> Optional[int]:
     """Authenticate user and return user ID if successful"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
-    c.execute('SELECT id, password_hash FROM users WHERE email = ?', (email,))
-    result = c.fetchone()
-    conn.close()
-    
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id, password_hash FROM users WHERE email = ?', (email,))
+        result = c.fetchone()
+
     if result and bcrypt.checkpw(password.encode('utf-8'), result[1].encode('utf-8')):
         return result[0]
     return None
 
 def update_user_profile(user_id: int, profile_data: Dict[str, Any]) -> bool:
     """Update user profile information"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
     try:
-        c.execute('''UPDATE users 
-                     SET full_name = ?, date_of_birth = ?, blood_group = ?, 
-                         height = ?, weight = ?, allergies = ?, medications = ?,
-                         chronic_conditions = ?, emergency_contact = ?
-                     WHERE id = ?''',
-                 (profile_data.get('full_name'), profile_data.get('date_of_birth'),
-                  profile_data.get('blood_group'), profile_data.get('height'),
-                  profile_data.get('weight'), profile_data.get('allergies'),
-                  profile_data.get('medications'), profile_data.get('chronic_conditions'),
-                  profile_data.get('emergency_contact'), user_id))
-        conn.commit()
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute('''UPDATE users
+                         SET full_name = ?, date_of_birth = ?, blood_group = ?,
+                             height = ?, weight = ?, allergies = ?, medications = ?,
+                             chronic_conditions = ?, emergency_contact = ?
+                         WHERE id = ?''',
+                     (profile_data.get('full_name'), profile_data.get('date_of_birth'),
+                      profile_data.get('blood_group'), profile_data.get('height'),
+                      profile_data.get('weight'), profile_data.get('allergies'),
+                      profile_data.get('medications'), profile_data.get('chronic_conditions'),
+                      profile_data.get('emergency_contact'), user_id))
+            _bump_data_version(c, user_id)
         return True
     except Exception as e:
         print(f"Error updating profile: {e}")
         return False
-    finally:
-        conn.close()
 
 def get_user_profile(user_id: int) -> Optional[Dict[str, Any]]:
     """Get user profile information"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
-    c.execute('''SELECT email, full_name, date_of_birth, blood_group, height, weight, 
-                        allergies, medications, chronic_conditions, emergency_contact
-                 FROM users WHERE id = ?''', (user_id,))
-    result = c.fetchone()
-    conn.close()
-    
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('''SELECT email, full_name, date_of_birth, blood_group, height, weight,
+                            allergies, medications, chronic_conditions, emergency_contact
+                     FROM users WHERE id = ?''', (user_id,))
+        result = c.fetchone()
+
     if result:
         return {
             'email': result[0],
@@ -89,191 +94,586 @@ def get_user_profile(user_id: int) -> Optional[Dict[str, Any]]:
 
 def add_health_log(user_id: int, symptoms: str, notes: str = "", severity_score: int = None) -> int:
     """Add a new health log entry"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
     today = date.today().isoformat()
     created_at = datetime.now().isoformat()
-    
-    c.execute('''INSERT INTO health_logs (user_id, date, symptoms, severity_score, notes, created_at)
-                 VALUES (?, ?, ?, ?, ?, ?)''',
-             (user_id, today, symptoms, severity_score, notes, created_at))
-    log_id = c.lastrowid
-    
-    # Update daily streak
-    c.execute('''INSERT OR REPLACE INTO daily_streaks (user_id, date, completed, created_at)
-                 VALUES (?, ?, 1, ?)''',
-             (user_id, today, created_at))
-    
-    conn.commit()
-    conn.close()
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('''INSERT INTO health_logs (user_id, date, symptoms, severity_score, notes, created_at)
+                     VALUES (?, ?, ?, ?, ?, ?)''',
+                 (user_id, today, symptoms, severity_score, notes, created_at))
+        log_id = c.lastrowid
+
+        # Update daily streak
+        c.execute('''SELECT 1 FROM daily_streaks
+                     WHERE user_id = ? AND date = ? AND completed = 1''', (user_id, today))
+        already_checked_in = c.fetchone() is not None
+
+        c.execute('''INSERT OR REPLACE INTO daily_streaks (user_id, date, completed, created_at)
+                     VALUES (?, ?, 1, ?)''',
+                 (user_id, today, created_at))
+
+        if not already_checked_in:
+            _record_streak_day(c, user_id, today)
+
+        _add_to_severity_aggregates(c, user_id, today, _hour_of(created_at), severity_score)
+        _bump_data_version(c, user_id)
+
     return log_id
 
-def get_health_logs(user_id: int, limit: int = 30) -> List[Dict[str, Any]]:
-    """Get health logs for a user"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
-    c.execute('''SELECT id, date, symptoms, severity_score, notes, created_at
-                 FROM health_logs 
-                 WHERE user_id = ? 
-                 ORDER BY date DESC 
-                 LIMIT ?''', (user_id, limit))
-    
-    logs = []
-    for row in c.fetchall():
-        logs.append({
-            'id': row[0],
-            'date': row[1],
-            'symptoms': row[2],
-            'severity_score': row[3],
-            'notes': row[4],
-            'created_at': row[5]
-        })
-    
-    conn.close()
-    return logs
-
-def add_triage_result(user_id: int, symptoms: str, triage_level: str, 
-                     confidence: str, reasoning: str, recommended_action: str, 
+def delete_daily_checkin(user_id: int, checkin_date: str) -> None:
+    """Delete a user's health logs and streak entry for one day"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT created_at, severity_score FROM health_logs WHERE user_id = ? AND date = ?",
+                 (user_id, checkin_date))
+        removed_logs = c.fetchall()
+        c.execute("DELETE FROM health_logs WHERE user_id = ? AND date = ?",
+                 (user_id, checkin_date))
+        for created_at, severity_score in removed_logs:
+            _remove_from_severity_aggregates(c, user_id, checkin_date, _hour_of(created_at), severity_score)
+
+        c.execute("DELETE FROM daily_streaks WHERE user_id = ? AND date = ? AND completed = 1",
+                 (user_id, checkin_date))
+        removed_streak_day = c.rowcount > 0
+        c.execute("DELETE FROM daily_streaks WHERE user_id = ? AND date = ?",
+                 (user_id, checkin_date))
+
+        if removed_streak_day:
+            _remove_streak_day(c, user_id, checkin_date)
+
+        _bump_data_version(c, user_id)
+
+# Severity aggregate tables: per-user buckets by calendar day and by hour of
+# day, each holding count/sum/min/max of severity_score. bucket_expr
+# recomputes a bucket's key from a health_logs row.
+_SEVERITY_AGGREGATES = (
+    ('severity_daily_aggregates', 'date', 'date'),
+    ('severity_hourly_aggregates', 'hour', 'CAST(substr(created_at, 12, 2) AS INTEGER)'),
+)
+
+def _hour_of(created_at: str) -> int:
+    """Hour of day from an ISO timestamp (matches the SQL bucket expression)"""
+    return int(created_at[11:13])
+
+def _add_to_severity_aggregates(c: sqlite3.Cursor, user_id: int, day: str, hour: int,
+                                severity_score: Optional[int]) -> None:
+    """Fold one new health log into its daily and hourly severity buckets"""
+    scored = 1 if severity_score is not None else 0
+    for (table, bucket_column, _), bucket in zip(_SEVERITY_AGGREGATES, (day, hour)):
+        c.execute(f'''INSERT INTO {table}
+                      (user_id, {bucket_column}, log_count, score_count, score_sum, score_min, score_max)
+                      VALUES (?, ?, 1, ?, ?, ?, ?)
+                      ON CONFLICT(user_id, {bucket_column}) DO UPDATE SET
+                          log_count = log_count + 1,
+                          score_count = score_count + excluded.score_count,
+                          score_sum = score_sum + excluded.score_sum,
+                          score_min = min(coalesce(score_min, excluded.score_min),
+                                          coalesce(excluded.score_min, score_min)),
+                          score_max = max(coalesce(score_max, excluded.score_max),
+                                          coalesce(excluded.score_max, score_max))''',
+                 (user_id, bucket, scored, severity_score or 0, severity_score, severity_score))
+
+def _remove_from_severity_aggregates(c: sqlite3.Cursor, user_id: int, day: str, hour: int,
+                                     severity_score: Optional[int]) -> None:
+    """Take one deleted health log back out of its severity buckets
+
+    Counts and sums are decremented in place. Only when the removed score
+    was the bucket's min or max is that one bucket's range recomputed from
+    the remaining logs (call this after the log row is gone).
+    """
+    scored = 1 if severity_score is not None else 0
+    for (table, bucket_column, bucket_expr), bucket in zip(_SEVERITY_AGGREGATES, (day, hour)):
+        c.execute(f'''UPDATE {table}
+                      SET log_count = log_count - 1,
+                          score_count = score_count - ?,
+                          score_sum = score_sum - ?
+                      WHERE user_id = ? AND {bucket_column} = ?''',
+                 (scored, severity_score or 0, user_id, bucket))
+        c.execute(f'DELETE FROM {table} WHERE user_id = ? AND {bucket_column} = ? AND log_count <= 0',
+                 (user_id, bucket))
+
+        if severity_score is None:
+            continue
+        c.execute(f'''SELECT score_min, score_max FROM {table}
+                      WHERE user_id = ? AND {bucket_column} = ?''', (user_id, bucket))
+        row = c.fetchone()
+        if row and severity_score in row:
+            c.execute(f'''UPDATE {table}
+                          SET (score_min, score_max) = (
+                              SELECT MIN(severity_score), MAX(severity_score) FROM health_logs
+                              WHERE user_id = ? AND {bucket_expr} = ?)
+                          WHERE user_id = ? AND {bucket_column} = ?''',
+                     (user_id, bucket, user_id, bucket))
+
+def rebuild_severity_aggregates(user_id: Optional[int] = None) -> int:
+    """Recompute daily and hourly severity aggregates from health_logs; returns buckets written"""
+    user_filter = "WHERE user_id = ?" if user_id is not None else ""
+    params = (user_id,) if user_id is not None else ()
+    written = 0
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        for table, bucket_column, bucket_expr in _SEVERITY_AGGREGATES:
+            c.execute(f'DELETE FROM {table} {user_filter}', params)
+            c.execute(f'''INSERT INTO {table}
+                          (user_id, {bucket_column}, log_count, score_count, score_sum, score_min, score_max)
+                          SELECT user_id, {bucket_expr}, COUNT(*), COUNT(severity_score),
+                                 TOTAL(severity_score), MIN(severity_score), MAX(severity_score)
+                          FROM health_logs {user_filter}
+                          GROUP BY user_id, {bucket_expr}''', params)
+            written += c.rowcount
+    return written
+
+def get_daily_severity_aggregates(user_id: int, start_date: Optional[str] = None,
+                                  end_date: Optional[str] = None) -> Dict[str, list]:
+    """Per-day severity buckets for a user in [start_date, end_date], oldest first (columnar)"""
+    where, params = _range_filter('date', start_date, end_date, end_inclusive=True)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(f'''SELECT date, log_count, score_count, score_sum, score_min, score_max
+                      FROM severity_daily_aggregates
+                      WHERE user_id = ?{where}
+                      ORDER BY date''', (user_id,) + params)
+        return _fetch_columns(c)
+
+def get_hourly_severity_aggregates(user_id: int) -> Dict[str, list]:
+    """Per-hour-of-day severity buckets for a user's whole history (columnar)"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('''SELECT hour, log_count, score_count, score_sum, score_min, score_max
+                     FROM severity_hourly_aggregates
+                     WHERE user_id = ?
+                     ORDER BY hour''', (user_id,))
+        return _fetch_columns(c)
+
+def _range_filter(column: str, start: Optional[str], end: Optional[str],
+                  end_inclusive: bool) -> Tuple[str, tuple]:
+    """SQL predicates for an optional [start, end] bound on column
+
+    Only the bounds that are set are emitted, so SQLite can turn them into
+    an index range instead of a filter over all of the user's rows.
+    """
+    where, params = '', ()
+    if start is not None:
+        where += f' AND {column} >= ?'
+        params += (start,)
+    if end is not None:
+        where += f" AND {column} {'<=' if end_inclusive else '<'} ?"
+        params += (end,)
+    return where, params
+
+def _encode_cursor(*key) -> str:
+    """Opaque page cursor holding the sort key of the last row returned"""
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid page cursor: {cursor!r}") from e
+
+def _fetch_columns(c: sqlite3.Cursor, batch_size: int = 10000) -> Dict[str, list]:
+    """Read a result set as {column name: list of values}, skipping per-row dicts
+
+    Rows are transposed a batch at a time, so the full list of row tuples
+    never exists alongside the columns.
+    """
+    names = [column[0] for column in c.description]
+    columns = [[] for _ in names]
+    while True:
+        rows = c.fetchmany(batch_size)
+        if not rows:
+            break
+        for column, values in zip(columns, zip(*rows)):
+            column.extend(values)
+    return dict(zip(names, columns))
+
+def _iter_rows(query: str, params: tuple, row_factory, batch_size: int) -> Iterator[Dict[str, Any]]:
+    """Stream rows of one query with fetchmany on a connection of their own"""
+    with get_dedicated_connection() as conn:
+        c = conn.cursor()
+        c.execute(query, params)
+        while True:
+            rows = c.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield row_factory(row)
+
+_HEALTH_LOG_COLUMNS = 'id, date, symptoms, severity_score, notes, created_at'
+
+def _health_log_from_row(row) -> Dict[str, Any]:
+    return {
+        'id': row[0],
+        'date': row[1],
+        'symptoms': row[2],
+        'severity_score': row[3],
+        'notes': row[4],
+        'created_at': row[5]
+    }
+
+def get_health_logs(user_id: int, limit: int = 30,
+                    columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, list]]:
+    """Get health logs for a user
+
+    With columnar=True the result is a dict of column lists instead of a
+    list of row dicts (cheaper to build and to hand to pandas).
+    """
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(f'''SELECT {_HEALTH_LOG_COLUMNS}
+                      FROM health_logs
+                      WHERE user_id = ?
+                      ORDER BY date DESC
+                      LIMIT ?''', (user_id, limit))
+        if columnar:
+            return _fetch_columns(c)
+        rows = c.fetchall()
+
+    return [_health_log_from_row(row) for row in rows]
+
+def get_health_logs_between(user_id: int, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None,
+                            columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, list]]:
+    """Get a user's health logs dated within [start_date, end_date], newest first
+
+    Either bound may be None to leave that side open. Dates are ISO
+    strings (YYYY-MM-DD) and the filter runs on the (user_id, date) index.
+    columnar=True returns a dict of column lists as in get_health_logs.
+    """
+    where, params = _range_filter('date', start_date, end_date, end_inclusive=True)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(f'''SELECT {_HEALTH_LOG_COLUMNS}
+                      FROM health_logs
+                      WHERE user_id = ?{where}
+                      ORDER BY date DESC''', (user_id,) + params)
+        if columnar:
+            return _fetch_columns(c)
+        rows = c.fetchall()
+
+    return [_health_log_from_row(row) for row in rows]
+
+def get_health_logs_page(user_id: int, limit: int = 30, cursor: Optional[str] = None,
+                         start_date: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one page of a user's health logs, newest first
+
+    Returns the page and a cursor for the next (older) page, or None when
+    there is nothing older. Pages are keyset-based, so each costs O(limit)
+    however deep the caller has paged. start_date stops paging at that date.
+    """
+    where, params = _range_filter('date', start_date, None, end_inclusive=True)
+    if cursor is not None:
+        where += ' AND (date, id) < (?, ?)'
+        params += tuple(_decode_cursor(cursor))
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(f'''SELECT {_HEALTH_LOG_COLUMNS}
+                      FROM health_logs
+                      WHERE user_id = ?{where}
+                      ORDER BY date DESC, id DESC
+                      LIMIT ?''', (user_id,) + params + (limit + 1,))
+        rows = c.fetchall()
+
+    logs = [_health_log_from_row(row) for row in rows[:limit]]
+    next_cursor = _encode_cursor(logs[-1]['date'], logs[-1]['id']) if len(rows) > limit else None
+    return logs, next_cursor
+
+def iter_health_logs(user_id: int, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                     batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """Stream a user's health logs (newest first) without materializing them all"""
+    where, params = _range_filter('date', start_date, end_date, end_inclusive=True)
+    return _iter_rows(f'''SELECT {_HEALTH_LOG_COLUMNS}
+                          FROM health_logs
+                          WHERE user_id = ?{where}
+                          ORDER BY date DESC, id DESC''',
+                      (user_id,) + params, _health_log_from_row, batch_size)
+
+def add_triage_result(user_id: int, symptoms: str, triage_level: str,
+                     confidence: str, reasoning: str, recommended_action: str,
                      detailed_analysis: str) -> int:
     """Add a triage result"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
     created_at = datetime.now().isoformat()
-    
-    c.execute('''INSERT INTO triage_results 
-                 (user_id, symptoms, triage_level, confidence, reasoning, 
-                  recommended_action, detailed_analysis, created_at)
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-             (user_id, symptoms, triage_level, confidence, reasoning, 
-              recommended_action, detailed_analysis, created_at))
-    
-    result_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return result_id
-
-def get_triage_history(user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
-    """Get triage history for a user"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
-    c.execute('''SELECT id, symptoms, triage_level, confidence, reasoning, 
-                        recommended_action, created_at
-                 FROM triage_results 
-                 WHERE user_id = ? 
-                 ORDER BY created_at DESC 
-                 LIMIT ?''', (user_id, limit))
-    
-    history = []
-    for row in c.fetchall():
-        history.append({
-            'id': row[0],
-            'symptoms': row[1],
-            'triage_level': row[2],
-            'confidence': row[3],
-            'reasoning': row[4],
-            'recommended_action': row[5],
-            'created_at': row[6]
-        })
-    
-    conn.close()
-    return history
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('''INSERT INTO triage_results
+                     (user_id, symptoms, triage_level, confidence, reasoning,
+                      recommended_action, detailed_analysis, created_at)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                 (user_id, symptoms, triage_level, confidence, reasoning,
+                  recommended_action, detailed_analysis, created_at))
+        result_id = c.lastrowid
+        _bump_data_version(c, user_id)
+        return result_id
+
+_TRIAGE_COLUMNS = 'id, symptoms, triage_level, confidence, reasoning, recommended_action, created_at'
+
+def _triage_from_row(row) -> Dict[str, Any]:
+    return {
+        'id': row[0],
+        'symptoms': row[1],
+        'triage_level': row[2],
+        'confidence': row[3],
+        'reasoning': row[4],
+        'recommended_action': row[5],
+        'created_at': row[6]
+    }
+
+def get_triage_history(user_id: int, limit: int = 10,
+                       columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, list]]:
+    """Get triage history for a user (columnar=True for a dict of column lists)"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(f'''SELECT {_TRIAGE_COLUMNS}
+                      FROM triage_results
+                      WHERE user_id = ?
+                      ORDER BY created_at DESC
+                      LIMIT ?''', (user_id, limit))
+        if columnar:
+            return _fetch_columns(c)
+        rows = c.fetchall()
+
+    return [_triage_from_row(row) for row in rows]
+
+def _day_after(day: Optional[str]) -> Optional[str]:
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat() if day else None
+
+def get_triage_history_between(user_id: int, start_date: Optional[str] = None,
+                               end_date: Optional[str] = None,
+                               columnar: bool = False) -> Union[List[Dict[str, Any]], Dict[str, list]]:
+    """Get a user's triage results created on days within [start_date, end_date], newest first
+
+    Bounds are ISO dates and may be None. created_at holds full timestamps,
+    so the end bound is applied as "before the following day" to stay on
+    the (user_id, created_at) index. columnar=True returns column lists.
+    """
+    where, params = _range_filter('created_at', start_date, _day_after(end_date), end_inclusive=False)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(f'''SELECT {_TRIAGE_COLUMNS}
+                      FROM triage_results
+                      WHERE user_id = ?{where}
+                      ORDER BY created_at DESC''', (user_id,) + params)
+        if columnar:
+            return _fetch_columns(c)
+        rows = c.fetchall()
+
+    return [_triage_from_row(row) for row in rows]
+
+def get_triage_history_page(user_id: int, limit: int = 10,
+                            cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one page of a user's triage results, newest first, plus the next-page cursor"""
+    where, params = '', ()
+    if cursor is not None:
+        where, params = ' AND (created_at, id) < (?, ?)', tuple(_decode_cursor(cursor))
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(f'''SELECT {_TRIAGE_COLUMNS}
+                      FROM triage_results
+                      WHERE user_id = ?{where}
+                      ORDER BY created_at DESC, id DESC
+                      LIMIT ?''', (user_id,) + params + (limit + 1,))
+        rows = c.fetchall()
+
+    history = [_triage_from_row(row) for row in rows[:limit]]
+    next_cursor = (_encode_cursor(history[-1]['created_at'], history[-1]['id'])
+                   if len(rows) > limit else None)
+    return history, next_cursor
+
+def iter_triage_history(user_id: int, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                        batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """Stream a user's triage results (newest first) without materializing them all"""
+    where, params = _range_filter('created_at', start_date, _day_after(end_date), end_inclusive=False)
+    return _iter_rows(f'''SELECT {_TRIAGE_COLUMNS}
+                          FROM triage_results
+                          WHERE user_id = ?{where}
+                          ORDER BY created_at DESC, id DESC''',
+                      (user_id,) + params, _triage_from_row, batch_size)
+
+def _record_streak_day(c: sqlite3.Cursor, user_id: int, checkin_date: str) -> None:
+    """Extend a user's streak summary with a newly completed day"""
+    c.execute('''SELECT current_streak, longest_streak, last_checkin_date, total_logs
+                 FROM streak_summaries WHERE user_id = ?''', (user_id,))
+    row = c.fetchone()
+
+    if row is None:
+        current_streak, longest_streak, total_logs = 1, 1, 1
+    else:
+        current_streak, longest_streak, last_date, total_logs = row
+        if last_date and last_date >= checkin_date:
+            # Back-dated entry: the run lengths can't be patched in place
+            _rebuild_streak_summaries(c, user_id)
+            return
+        previous_day = (date.fromisoformat(checkin_date) - timedelta(days=1)).isoformat()
+        current_streak = current_streak + 1 if last_date == previous_day else 1
+        longest_streak = max(longest_streak, current_streak)
+        total_logs += 1
+
+    c.execute('''INSERT OR REPLACE INTO streak_summaries
+                 (user_id, current_streak, longest_streak, last_checkin_date, total_logs, updated_at)
+                 VALUES (?, ?, ?, ?, ?, ?)''',
+             (user_id, current_streak, longest_streak, checkin_date, total_logs,
+              datetime.now().isoformat()))
+
+def _remove_streak_day(c: sqlite3.Cursor, user_id: int, checkin_date: str) -> None:
+    """Shrink a user's streak summary after a completed day was deleted"""
+    c.execute('''SELECT current_streak, longest_streak, last_checkin_date, total_logs
+                 FROM streak_summaries WHERE user_id = ?''', (user_id,))
+    row = c.fetchone()
+
+    # Dropping the last day of a run that is not the longest one only shortens
+    # that run by a day. Anything else (an older day, the run that might be the
+    # longest, or the run's only day) needs the neighbouring runs, so fall back
+    # to recomputing this one user.
+    if (row is None or row[2] != checkin_date or row[0] <= 1 or row[1] <= row[0]):
+        _rebuild_streak_summaries(c, user_id)
+        return
+
+    current_streak, longest_streak, _, total_logs = row
+    previous_day = (date.fromisoformat(checkin_date) - timedelta(days=1)).isoformat()
+    c.execute('''UPDATE streak_summaries
+                 SET current_streak = ?, last_checkin_date = ?, total_logs = ?, updated_at = ?
+                 WHERE user_id = ?''',
+             (current_streak - 1, previous_day, total_logs - 1,
+              datetime.now().isoformat(), user_id))
+
+def _rebuild_streak_summaries(c: sqlite3.Cursor, user_id: Optional[int] = None) -> None:
+    """Recompute streak summaries from daily_streaks in a single SQL pass"""
+    user_filter = "AND user_id = ?" if user_id is not None else ""
+    params = (user_id,) if user_id is not None else ()
+
+    if user_id is not None:
+        c.execute('DELETE FROM streak_summaries WHERE user_id = ?', params)
+    else:
+        c.execute('DELETE FROM streak_summaries')
+
+    # Consecutive days share the same (julianday - row_number) value, which
+    # groups every user's check-ins into runs without walking them in Python.
+    c.execute(f'''WITH days AS (
+                     SELECT user_id, date,
+                            julianday(date) - ROW_NUMBER() OVER (
+                                PARTITION BY user_id ORDER BY date) AS run_key
+                     FROM daily_streaks
+                     WHERE completed = 1 {user_filter}
+                 ),
+                 runs AS (
+                     SELECT user_id, MAX(date) AS end_date, COUNT(*) AS length
+                     FROM days GROUP BY user_id, run_key
+                 )
+                 INSERT INTO streak_summaries
+                     (user_id, current_streak, longest_streak, last_checkin_date, total_logs, updated_at)
+                 SELECT user_id,
+                        (SELECT r.length FROM runs r WHERE r.user_id = runs.user_id
+                         ORDER BY r.end_date DESC LIMIT 1),
+                        MAX(length), MAX(end_date), SUM(length), ?
+                 FROM runs GROUP BY user_id''',
+             params + (datetime.now().isoformat(),))
+
+def rebuild_streak_summaries(user_id: Optional[int] = None) -> int:
+    """Recompute streak summaries for one user or for everyone; returns rows written"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        _rebuild_streak_summaries(c, user_id)
+        if user_id is not None:
+            c.execute('SELECT COUNT(*) FROM streak_summaries WHERE user_id = ?', (user_id,))
+        else:
+            c.execute('SELECT COUNT(*) FROM streak_summaries')
+        return c.fetchone()[0]
 
 def get_streak_data(user_id: int) -> Dict[str, Any]:
     """Get user's streak information"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
-    # Get current streak
-    c.execute('''SELECT date FROM daily_streaks 
-                 WHERE user_id = ? AND completed = 1 
-                 ORDER BY date DESC''', (user_id,))
-    
-    streaks = [row[0] for row in c.fetchall()]
-    
-    # Calculate current streak
-    current_streak = 0
-    today = date.today()
-    
-    for i, streak_date in enumerate(streaks):
-        expected_date = (today - timedelta(days=i)).isoformat()
-        if streak_date == expected_date:
-            current_streak += 1
-        else:
-            break
-    
-    # Get longest streak
-    longest_streak = 0
-    current = 0
-    prev_date = None
-    
-    for streak_date in sorted(streaks):
-        current_date = datetime.strptime(streak_date, '%Y-%m-%d').date()
-        if prev_date and (current_date - prev_date).days == 1:
-            current += 1
-        else:
-            current = 1
-        longest_streak = max(longest_streak, current)
-        prev_date = current_date
-    
-    conn.close()
-    
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('''SELECT current_streak, longest_streak, last_checkin_date, total_logs
+                     FROM streak_summaries WHERE user_id = ?''', (user_id,))
+        row = c.fetchone()
+
+    if row is None:
+        return {'current_streak': 0, 'longest_streak': 0, 'total_logs': 0}
+
+    run_length, longest_streak, last_checkin_date, total_logs = row
+
+    # The stored run only counts as the current streak if it reaches today
+    current_streak = run_length if last_checkin_date == date.today().isoformat() else 0
+
     return {
         'current_streak': current_streak,
         'longest_streak': longest_streak or current_streak,
-        'total_logs': len(streaks)
+        'total_logs': total_logs
     }
 
 def create_chat_session(user_id: int, session_type: str = "general") -> int:
     """Create a new chat session"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
     created_at = datetime.now().isoformat()
-    
-    c.execute('INSERT INTO chat_sessions (user_id, session_type, created_at) VALUES (?, ?, ?)',
-             (user_id, session_type, created_at))
-    
-    session_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return session_id
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('INSERT INTO chat_sessions (user_id, session_type, created_at) VALUES (?, ?, ?)',
+                 (user_id, session_type, created_at))
+        return c.lastrowid
 
 def add_chat_message(session_id: int, role: str, content: str) -> int:
     """Add a message to a chat session"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
     timestamp = datetime.now().isoformat()
-    
-    c.execute('INSERT INTO chat_messages (session_id, role, content, timestamp) VALUES (?, ?, ?, ?)',
-             (session_id, role, content, timestamp))
-    
-    message_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return message_id
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('INSERT INTO chat_messages (session_id, role, content, timestamp) VALUES (?, ?, ?, ?)',
+                 (session_id, role, content, timestamp))
+        return c.lastrowid
 
 def get_chat_history(session_id: int) -> List[Dict[str, Any]]:
     """Get chat history for a session"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
-    c.execute('''SELECT role, content, timestamp 
-                 FROM chat_messages 
-                 WHERE session_id = ? 
-                 ORDER BY timestamp ASC''', (session_id,))
-    
-    history = []
-    for row in c.fetchall():
-        history.append({
-            'role': row[0],
-            'content': row[1],
-            'timestamp': row[2]
-        })
-    
-    conn.close()
-    return history
\ No newline at end of file
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('''SELECT role, content, timestamp
+                     FROM chat_messages
+                     WHERE session_id = ?
+                     ORDER BY timestamp ASC''', (session_id,))
+        rows = c.fetchall()
+
+    return [_chat_message_from_row(row) for row in rows]
+
+def _chat_message_from_row(row) -> Dict[str, Any]:
+    return {
+        'role': row[0],
+        'content': row[1],
+        'timestamp': row[2]
+    }
+
+def get_chat_history_page(session_id: int, limit: int = 50,
+                          cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get the latest messages of a session in chronological order
+
+    With a cursor, returns the messages just before that page instead. The
+    second value is the cursor for the next older page, or None at the
+    start of the conversation.
+    """
+    where, params = '', ()
+    if cursor is not None:
+        where, params = ' AND (timestamp, id) < (?, ?)', tuple(_decode_cursor(cursor))
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(f'''SELECT role, content, timestamp, id
+                      FROM chat_messages
+                      WHERE session_id = ?{where}
+                      ORDER BY timestamp DESC, id DESC
+                      LIMIT ?''', (session_id,) + params + (limit + 1,))
+        rows = c.fetchall()
+
+    page = rows[:limit]
+    next_cursor = _encode_cursor(page[-1][2], page[-1][3]) if len(rows) > limit else None
+    return [_chat_message_from_row(row) for row in reversed(page)], next_cursor
+
+def iter_chat_history(session_id: int, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """Stream a session's messages in chronological order"""
+    return _iter_rows('''SELECT role, content, timestamp
+                         FROM chat_messages
+                         WHERE session_id = ?
+                         ORDER BY timestamp ASC, id ASC''',
+                      (session_id,), _chat_message_from_row, batch_size)
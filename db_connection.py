@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+import queue
+from contextlib import contextmanager
+from typing import Optional
+
+from config import DATABASE_PATH, DB_POOL_SIZE, DB_BUSY_TIMEOUT_MS, DB_MMAP_SIZE
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared by all Streamlit sessions.
+
+    Connections are opened lazily up to ``max_connections`` and configured
+    once for WAL mode. A thread that already holds a connection gets the same
+    one back on nested use, so helpers can call each other inside a single
+    transaction without deadlocking the pool.
+    """
+
+    def __init__(self, database: str, max_connections: int = 8, timeout: float = 30.0):
+        self.database = database
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.database, timeout=DB_BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT_MS)}')
+        conn.execute(f'PRAGMA mmap_size={int(DB_MMAP_SIZE)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No database connection available after {self.timeout}s")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return self._open()
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _release(self, conn: sqlite3.Connection):
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Yield a pooled connection; commit on success, roll back on error"""
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            # Nested use on the same thread joins the outer transaction
+            yield held
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    @contextmanager
+    def dedicated_connection(self):
+        """Yield a pooled connection that nested calls on this thread won't share
+
+        For long-lived readers such as generators: they may be suspended
+        while the same thread writes through connection(), and those writes
+        must not end up inside the reader's transaction.
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Close every connection opened by this pool"""
+        self._closed = True
+        with self._lock:
+            for conn in self._all:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._all.clear()
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Get the process-wide connection pool (created on first use)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DATABASE_PATH, DB_POOL_SIZE)
+    return _pool
+
+
+def configure_database(database_path: str, max_connections: int = None) -> ConnectionPool:
+    """Point the shared pool at a different database file (scripts, benchmarks)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(database_path, max_connections or DB_POOL_SIZE)
+    return _pool
+
+
+def get_connection():
+    """Context manager yielding a pooled connection from the shared pool"""
+    return get_pool().connection()
+
+
+def get_dedicated_connection():
+    """Context manager yielding a pooled connection private to one reader"""
+    return get_pool().dedicated_connection()
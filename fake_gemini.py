@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import json
+import random
+from typing import Any, Dict, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+# Per prompt type: lognormal latency (median in ms and sigma), error rate and
+# the canned reply. "{...}" replies are filled in by _respond().
+DEFAULT_PROFILE = {
+    'checkin': {'latency_median_ms': 900, 'latency_sigma': 0.5, 'error_rate': 0.0},
+    'triage': {'latency_median_ms': 900, 'latency_sigma': 0.5, 'error_rate': 0.0},
+    'score': {'latency_median_ms': 300, 'latency_sigma': 0.4, 'error_rate': 0.0},
+    'language': {'latency_median_ms': 200, 'latency_sigma': 0.3, 'error_rate': 0.0,
+                 'response': 'en'},
+    'report': {'latency_median_ms': 2500, 'latency_sigma': 0.4, 'error_rate': 0.0,
+               'response': ("Summary: symptoms were mild and improved over the period.\n"
+                            "Patterns: higher severity in the mornings.\n"
+                            "Recommendations: rest, fluids, and follow up if symptoms persist.")},
+    'chat': {'latency_median_ms': 700, 'latency_sigma': 0.5, 'error_rate': 0.0,
+             'response': ("Thanks for sharing that. Rest, stay hydrated, and see a doctor "
+                          "if the symptoms get worse or last more than a few days.")},
+}
+
+# Share of injected errors that are 429s; the rest are 503s
+_RATE_LIMIT_SHARE = 0.5
+
+# Streamed replies are cut into chunks of this many words, one per delay
+_STREAM_WORDS_PER_CHUNK = 4
+_STREAM_CHUNK_DELAY_MS = 40
+
+def classify_prompt(prompt: str) -> str:
+    """Which gemini_client call produced a prompt"""
+    if '"severity_score": integer' in prompt:
+        return 'checkin'
+    if 'medical triage assistant' in prompt:
+        return 'triage'
+    if 'provide a severity score' in prompt:
+        return 'score'
+    if 'Detect language' in prompt:
+        return 'language'
+    if 'Create a brief medical report' in prompt:
+        return 'report'
+    return 'chat'
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+class _StreamedResponse:
+    """Async iterable of chunk responses, like generate_content_async(stream=True)"""
+
+    def __init__(self, text: str, chunk_delay: float):
+        words = text.split(' ')
+        self._chunks = [' '.join(words[i:i + _STREAM_WORDS_PER_CHUNK]) + ' '
+                        for i in range(0, len(words), _STREAM_WORDS_PER_CHUNK)]
+        self._chunk_delay = chunk_delay
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(self._chunk_delay)
+            yield _Response(chunk)
+
+class FakeGenerativeModel:
+    """In-process stand-in for genai.GenerativeModel used for load tests and offline runs
+
+    Answers every prompt gemini_client sends with a canned reply after a
+    simulated latency, and injects 429/503 errors at the configured rate.
+    latency_scale multiplies every delay (0 answers immediately).
+    """
+
+    model_name = 'fake-gemini'
+
+    def __init__(self, profile: Optional[Dict[str, Dict[str, Any]]] = None, error_rate: Optional[float] = None,
+                 latency_scale: float = 1.0, seed: Optional[int] = None):
+        self.profile = {kind: dict(settings) for kind, settings in DEFAULT_PROFILE.items()}
+        for kind, settings in (profile or {}).items():
+            self.profile.setdefault(kind, {}).update(settings)
+        if error_rate is not None:
+            for settings in self.profile.values():
+                settings['error_rate'] = error_rate
+        self.latency_scale = latency_scale
+        self._generation_config = {}
+        self._random = random.Random(seed)
+        self.calls = {kind: 0 for kind in self.profile}
+        self.errors = 0
+
+    def _latency(self, settings: Dict[str, Any]) -> float:
+        median = settings.get('latency_median_ms', 500) / 1000
+        sigma = settings.get('latency_sigma', 0.5)
+        return median * self._random.lognormvariate(0, sigma) * self.latency_scale
+
+    def _respond(self, kind: str, prompt: str) -> str:
+        settings = self.profile[kind]
+        if 'response' in settings:
+            return settings['response']
+
+        # Stable per-prompt answers so repeated prompts look like the real thing
+        digest = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8], 16)
+        severity = digest % 101
+        if kind == 'score':
+            return str(severity)
+
+        assessment = {
+            'triage_level': 'visit-doctor' if severity >= 60 else 'self-monitor',
+            'confidence': ('Low', 'Medium', 'High')[digest % 3],
+            'reasoning': 'The described symptoms are consistent with a common, self-limiting illness.',
+            'recommended_action': 'Rest, drink fluids and monitor your symptoms for the next few days.',
+            'detailed_analysis': 'No red-flag symptoms were reported. Seek care if fever rises or breathing worsens.',
+        }
+        if kind == 'checkin':
+            assessment.update(severity_score=severity, language='en')
+        return json.dumps(assessment)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs):
+        kind = classify_prompt(prompt)
+        settings = self.profile[kind]
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+
+        await asyncio.sleep(self._latency(settings))
+        if self._random.random() < settings.get('error_rate', 0.0):
+            self.errors += 1
+            if self._random.random() < _RATE_LIMIT_SHARE:
+                raise google_exceptions.ResourceExhausted("Fake Gemini: quota exceeded")
+            raise google_exceptions.ServiceUnavailable("Fake Gemini: service unavailable")
+
+        text = self._respond(kind, prompt)
+        if stream:
+            return _StreamedResponse(text, _STREAM_CHUNK_DELAY_MS / 1000 * self.latency_scale)
+        return _Response(text)
+
+def load_profile(path: str) -> Dict[str, Dict[str, Any]]:
+    """Read per-prompt-type overrides ({type: {latency_median_ms, latency_sigma, error_rate, response}})"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
@@ -1,8 +1,28 @@
 # 
 import os
 import json
+import asyncio
+import concurrent.futures
+import threading
 import google.generativeai as genai
-from config import AI_API_KEY
+from google.api_core import exceptions as google_exceptions
+from config import (
+    AI_API_KEY, LANGUAGES, TRIAGE_LEVELS, GEMINI_MAX_CONCURRENCY, GEMINI_TIMEOUT_SECONDS,
+    GEMINI_REQUESTS_PER_MINUTE, GEMINI_BURST, GEMINI_MAX_RETRIES,
+    GEMINI_RETRY_BASE_SECONDS, GEMINI_RETRY_MAX_SECONDS,
+    GEMINI_BREAKER_FAILURE_THRESHOLD, GEMINI_BREAKER_RESET_SECONDS,
+    GEMINI_HEDGING_ENABLED, GEMINI_HEDGE_PERCENTILE, GEMINI_HEDGE_BUDGET,
+    GEMINI_HEDGE_WARMUP_DELAY_SECONDS, GEMINI_BACKEND, FAKE_GEMINI_PROFILE,
+    FAKE_GEMINI_ERROR_RATE, FAKE_GEMINI_LATENCY_SCALE, FAKE_GEMINI_SEED,
+    GEMINI_CALL_DEADLINE_SECONDS, GEMINI_CACHE_TTL_SECONDS, GEMINI_CACHE_MAX_ENTRIES,
+    GEMINI_CACHE_DB_PATH, GEMINI_CACHE_DB_MAX_ENTRIES,
+    LANGUAGE_DETECTION_MIN_CONFIDENCE
+)
+from fake_gemini import FakeGenerativeModel, load_profile
+from hedging import HedgePolicy, hedged_call
+from language_detection import detect_language_local
+from rate_limit import CircuitBreaker, TokenBucket, backoff_delay
+from response_cache import ResponseCache, make_cache_key
 
 # Configure Gemini
 genai.configure(api_key=AI_API_KEY)
@@ -10,12 +30,62 @@ genai.configure(api_key=AI_API_KEY)
 # Global model instance for better performance
 _model_instance = None
 
+# Shared request scheduler: a single event loop on a daemon thread runs every
+# model call for all Streamlit sessions, bounded by one global semaphore.
+_loop = None
+_loop_lock = threading.Lock()
+_request_slots = None
+
+# Responses keyed on (model, generation config, normalized prompt)
+_response_cache = ResponseCache(
+    ttl=GEMINI_CACHE_TTL_SECONDS,
+    max_entries=GEMINI_CACHE_MAX_ENTRIES,
+    db_path=GEMINI_CACHE_DB_PATH or None,
+    db_max_entries=GEMINI_CACHE_DB_MAX_ENTRIES
+)
+
+# Quota guard shared by every call on the scheduler loop
+_rate_limiter = TokenBucket(GEMINI_REQUESTS_PER_MINUTE / 60, GEMINI_BURST)
+_circuit_breaker = CircuitBreaker(GEMINI_BREAKER_FAILURE_THRESHOLD, GEMINI_BREAKER_RESET_SECONDS)
+_retry_stats = {'retries': 0, 'retry_wait_seconds': 0.0, 'gave_up': 0}
+
+# Latency tracking and budget for hedged (triage) requests
+_hedge_policy = HedgePolicy(GEMINI_HEDGE_PERCENTILE, GEMINI_HEDGE_BUDGET, GEMINI_HEDGE_WARMUP_DELAY_SECONDS)
+
+# Requests currently awaiting upstream, by cache key (only touched on the loop)
+_in_flight = {}
+_coalescing_stats = {'leaders': 0, 'coalesced': 0}
+
+# Replies used in place of a model answer when a call fails
+ANALYSIS_ERROR_REASONING = "Error in analysis"
+CHAT_ERROR_MESSAGE = "I'm having trouble responding right now. Please try again."
+REPORT_ERROR_MESSAGE = "Error generating report. Please try again."
+
+# Errors worth retrying: quota (429), transient server errors and timeouts
+_RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+    asyncio.TimeoutError,
+)
+
 def setup_gemini_model():
     """Set up the Gemini model (singleton pattern for better performance)"""
     global _model_instance
     if _model_instance is not None:
         return _model_instance
-    
+
+    if GEMINI_BACKEND == 'fake':
+        _model_instance = FakeGenerativeModel(
+            load_profile(FAKE_GEMINI_PROFILE) if FAKE_GEMINI_PROFILE else None,
+            error_rate=float(FAKE_GEMINI_ERROR_RATE) if FAKE_GEMINI_ERROR_RATE else None,
+            latency_scale=FAKE_GEMINI_LATENCY_SCALE,
+            seed=int(FAKE_GEMINI_SEED) if FAKE_GEMINI_SEED else None
+        )
+        return _model_instance
+
     try:
         # Use gemini-2.0-flash for faster responses
         _model_instance = genai.GenerativeModel(
@@ -32,26 +102,267 @@ def setup_gemini_model():
         print(f"Error setting up Gemini model: {e}")
         return None
 
-def evaluate_health_score(symptoms_text: str) -> int:
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Start the scheduler loop on first use and return it"""
+    global _loop, _request_slots
+    if _loop is not None:
+        return _loop
+
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="gemini-scheduler", daemon=True).start()
+            _request_slots = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+            _loop = loop
+    return _loop
+
+# Blocking callers wait this much longer than the in-loop deadline, so the
+# coroutine's own fallback normally wins and this wait is only a backstop
+_SYNC_WAIT_SECONDS = GEMINI_CALL_DEADLINE_SECONDS + 5
+
+def _wait(future: concurrent.futures.Future, timeout: float):
+    """Wait for a scheduler future, cancelling it if the wait times out"""
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+def run_sync(coro, timeout: float = _SYNC_WAIT_SECONDS):
+    """Run a coroutine on the shared scheduler and block until it finishes (or timeout)"""
+    return _wait(asyncio.run_coroutine_threadsafe(coro, _get_loop()), timeout)
+
+def iterate_sync(agen, timeout: float = _SYNC_WAIT_SECONDS):
+    """Drive an async generator on the shared scheduler from synchronous code
+
+    timeout bounds the wait for each item, not the whole iteration.
+    """
+    loop = _get_loop()
+    try:
+        while True:
+            try:
+                yield _wait(asyncio.run_coroutine_threadsafe(agen.__anext__(), loop), timeout)
+            except StopAsyncIteration:
+                return
+    finally:
+        # Runs on early exit too, so the request slot is always released
+        _wait(asyncio.run_coroutine_threadsafe(agen.aclose(), loop), timeout)
+
+def _cache_key(model, prompt: str, generation_config: dict = None) -> str:
+    config = dict(getattr(model, '_generation_config', None) or {})
+    config.update(generation_config or {})
+    return make_cache_key(getattr(model, 'model_name', ''), config, prompt)
+
+async def _call_with_retries(request):
+    """Await request() under the rate limiter and circuit breaker, retrying transient errors
+
+    Retryable failures (see _RETRYABLE_ERRORS) are retried up to
+    GEMINI_MAX_RETRIES times with full-jitter exponential backoff; a 429
+    also halves the limiter's rate. Other errors are raised at once. While
+    the breaker is open this raises CircuitOpenError without calling out.
+    """
+    attempt = 0
+    while True:
+        _circuit_breaker.before_call()
+        await _rate_limiter.acquire()
+        try:
+            result = await request()
+        except _RETRYABLE_ERRORS as e:
+            if isinstance(e, google_exceptions.TooManyRequests):
+                # Quota pressure, not an outage: slow down but keep the breaker closed
+                _circuit_breaker.record_success()
+                _rate_limiter.decrease()
+            else:
+                _circuit_breaker.record_failure()
+            if attempt >= GEMINI_MAX_RETRIES:
+                _retry_stats['gave_up'] += 1
+                raise
+            delay = backoff_delay(attempt, GEMINI_RETRY_BASE_SECONDS, GEMINI_RETRY_MAX_SECONDS)
+            _retry_stats['retries'] += 1
+            _retry_stats['retry_wait_seconds'] += delay
+            attempt += 1
+            await asyncio.sleep(delay)
+        except Exception:
+            # Upstream answered (e.g. a 400 for a bad request), so it is healthy
+            _circuit_breaker.record_success()
+            raise
+        except BaseException:
+            _circuit_breaker.record_cancelled()
+            raise
+        else:
+            _circuit_breaker.record_success()
+            _rate_limiter.increase()
+            return result
+
+async def _single_flight(key: str, request):
+    """Await request(), or join an identical request already in flight
+
+    Concurrent callers with the same key (model, config and normalized
+    prompt) share one upstream call and its outcome, error included. All
+    calls run on the scheduler loop, so this also coalesces requests made
+    from different Streamlit threads.
+    """
+    pending = _in_flight.get(key)
+    if pending is not None:
+        _coalescing_stats['coalesced'] += 1
+        # Shielded so a cancelled follower doesn't cancel the shared call
+        return await asyncio.shield(pending)
+
+    _coalescing_stats['leaders'] += 1
+    flight = asyncio.get_running_loop().create_future()
+    _in_flight[key] = flight
+    try:
+        result = await request()
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            e = RuntimeError("Shared Gemini request was cancelled")
+        flight.set_exception(e)
+        flight.exception()  # retrieved here so an unshared failure isn't logged as unhandled
+        raise
+    else:
+        flight.set_result(result)
+        return result
+    finally:
+        del _in_flight[key]
+
+async def _generate_async(model, prompt: str, timeout: float = None,
+                          use_cache: bool = True, parse=None, generation_config: dict = None,
+                          hedge: bool = False):
+    """Send one prompt through the cache, the global concurrency limit and a timeout
+
+    If parse is given the parsed value is returned, and the raw text is only
+    cached once it parses, so a malformed reply is never served again.
+    generation_config overrides the model defaults for this call only.
+    With hedge=True a slow call is raced against one backup request. The
+    whole call, rate-limit waits and retries included, is bounded by
+    GEMINI_CALL_DEADLINE_SECONDS.
+    """
+    flight_key = _cache_key(model, prompt, generation_config)
+    key = flight_key if use_cache else None
+    if key is not None:
+        cached = await _response_cache.get_async(key)
+        if cached is not None:
+            return parse(cached) if parse else cached
+
+    request_kwargs = {'generation_config': generation_config} if generation_config else {}
+
+    async def request():
+        async with _request_slots:
+            response = await asyncio.wait_for(model.generate_content_async(prompt, **request_kwargs),
+                                              timeout or GEMINI_TIMEOUT_SECONDS)
+        return response.text
+
+    if hedge:
+        attempt = lambda: hedged_call(_hedge_policy, request, before_hedge=_rate_limiter.acquire)
+    else:
+        attempt = request
+    response_text = await asyncio.wait_for(_single_flight(flight_key, lambda: _call_with_retries(attempt)),
+                                           GEMINI_CALL_DEADLINE_SECONDS)
+    result = parse(response_text) if parse else response_text
+
+    if key is not None:
+        await _response_cache.set_async(key, response_text)
+    return result
+
+async def _stream_async(model, prompt: str, timeout: float = None):
+    """Yield text chunks of one streamed reply, holding a request slot while it streams
+
+    The timeout applies to each chunk, so a long reply is fine as long as
+    the upstream keeps producing tokens.
+    """
+    timeout = timeout or GEMINI_TIMEOUT_SECONDS
+
+    async def open_stream():
+        # A slot per attempt, as in _generate_async, so retry backoff doesn't hold one
+        await _request_slots.acquire()
+        try:
+            return await asyncio.wait_for(model.generate_content_async(prompt, stream=True), timeout)
+        except BaseException:
+            _request_slots.release()
+            raise
+
+    # Only opening the stream is retried; once text is yielded it can't be replayed
+    response = await asyncio.wait_for(_call_with_retries(open_stream), GEMINI_CALL_DEADLINE_SECONDS)
+    try:
+        chunks = response.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+            except StopAsyncIteration:
+                return
+            if chunk.text:
+                yield chunk.text
+    finally:
+        _request_slots.release()
+
+def get_cache_stats() -> dict:
+    """Hit/miss counters of the Gemini response cache"""
+    return _response_cache.stats()
+
+def get_throttle_stats() -> dict:
+    """Rate limiter, retry and circuit breaker counters for Gemini calls"""
+    return {
+        'rate_limiter': _rate_limiter.stats(),
+        'retries': _retry_stats['retries'],
+        'retry_wait_seconds': round(_retry_stats['retry_wait_seconds'], 3),
+        'gave_up': _retry_stats['gave_up'],
+        'circuit_breaker': _circuit_breaker.stats(),
+    }
+
+def get_coalescing_stats() -> dict:
+    """Upstream calls made vs. calls that joined an identical in-flight request"""
+    return {
+        'upstream_calls': _coalescing_stats['leaders'],
+        'calls_saved': _coalescing_stats['coalesced'],
+        'in_flight': len(_in_flight),
+    }
+
+def get_hedging_stats() -> dict:
+    """Hedge rate, wins, budget rejections and estimated latency saved for triage calls"""
+    return _hedge_policy.stats()
+
+def clear_response_cache():
+    """Drop every cached Gemini response"""
+    _response_cache.clear()
+
+def _parse_json_response(response_text: str) -> dict:
+    """Parse a JSON reply, tolerating markdown code fences"""
+    response_text = response_text.strip()
+
+    # Clean response text (remove markdown code blocks if present)
+    if response_text.startswith("```json"):
+        response_text = response_text[7:]
+    if response_text.endswith("```"):
+        response_text = response_text[:-3]
+    if response_text.startswith("json"):
+        response_text = response_text[4:]
+
+    return json.loads(response_text)
+
+async def evaluate_health_score_async(symptoms_text: str, use_cache: bool = True) -> int:
     """Evaluate health score based on symptoms description"""
     model = setup_gemini_model()
     if not model:
         return 50  # Default if no model
-    
+
     prompt = f"""
 Analyze these health symptoms and provide a severity score from 0 (perfect health) to 100 (critical condition):
 {symptoms_text}
 
 Return ONLY a single integer number, nothing else.
 """
-    
+
     try:
-        response = model.generate_content(prompt)
-        return int(response.text.strip())
+        return await _generate_async(model, prompt, use_cache=use_cache,
+                                     parse=lambda text: int(text.strip()))
     except:
         return 50  # Default on error
 
-def generate_triage_assessment(symptoms: str, language: str = 'en') -> dict:
+def evaluate_health_score(symptoms_text: str, use_cache: bool = True) -> int:
+    """Evaluate health score based on symptoms description"""
+    return run_sync(evaluate_health_score_async(symptoms_text, use_cache))
+
+async def generate_triage_assessment_async(symptoms: str, language: str = 'en', use_cache: bool = True) -> dict:
     """Generate triage assessment using Gemini"""
     model = setup_gemini_model()
     if not model:
@@ -62,7 +373,7 @@ def generate_triage_assessment(symptoms: str, language: str = 'en') -> dict:
             "recommended_action": "Please try again later",
             "detailed_analysis": "Unable to generate analysis due to system error"
         }
-    
+
     prompt = f"""
 As a medical triage assistant, analyze these symptoms and provide recommendations:
 {symptoms}
@@ -77,39 +388,28 @@ Respond with a JSON object containing ONLY these fields:
 Return ONLY valid JSON, no other text. Respond in the same language as the user's symptoms.
 Keep responses concise and to the point.
 """
-    
+
     try:
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Clean response text (remove markdown code blocks if present)
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        if response_text.startswith("json"):
-            response_text = response_text[4:]
-        
-        return json.loads(response_text)
+        return await _generate_async(model, prompt, use_cache=use_cache,
+                                     parse=_parse_json_response, hedge=GEMINI_HEDGING_ENABLED)
     except Exception as e:
         return {
             "triage_level": "self-monitor",
             "confidence": "Medium",
-            "reasoning": f"Error in analysis",
+            "reasoning": ANALYSIS_ERROR_REASONING,
             "recommended_action": "Please consult a healthcare professional",
             "detailed_analysis": "Unable to generate detailed analysis"
         }
 
-def generate_chat_response(user_message: str, chat_history: list, language: str = 'en') -> str:
-    """Generate conversational response from health assistant"""
-    model = setup_gemini_model()
-    if not model:
-        return "I'm currently unavailable. Please try again later."
-    
+def generate_triage_assessment(symptoms: str, language: str = 'en', use_cache: bool = True) -> dict:
+    """Generate triage assessment using Gemini"""
+    return run_sync(generate_triage_assessment_async(symptoms, language, use_cache))
+
+def _chat_prompt(user_message: str, chat_history: list) -> str:
     # Format only the most recent 3 messages for faster processing
     history_text = "\n".join([f"{msg['role']}: {msg['content']}" for msg in chat_history[-3:]])
-    
-    prompt = f"""
+
+    return f"""
 You are a warm and approachable health assistant.
 Respond in the same language as the user's message. Keep responses concise (1-2 sentences max).
 
@@ -120,19 +420,60 @@ User: {user_message}
 
 Assistant (brief response in user's language):
 """
-    
+
+async def generate_chat_response_async(user_message: str, chat_history: list, language: str = 'en',
+                                      use_cache: bool = False) -> str:
+    """Generate conversational response from health assistant"""
+    model = setup_gemini_model()
+    if not model:
+        return "I'm currently unavailable. Please try again later."
+
+    prompt = _chat_prompt(user_message, chat_history)
+
+    try:
+        response_text = await _generate_async(model, prompt, use_cache=use_cache)
+        return response_text.strip()
+    except Exception as e:
+        return CHAT_ERROR_MESSAGE
+
+def generate_chat_response(user_message: str, chat_history: list, language: str = 'en',
+                           use_cache: bool = False) -> str:
+    """Generate conversational response from health assistant"""
+    return run_sync(generate_chat_response_async(user_message, chat_history, language, use_cache))
+
+async def generate_chat_response_stream_async(user_message: str, chat_history: list, language: str = 'en'):
+    """Stream the health assistant's reply as text chunks arrive"""
+    model = setup_gemini_model()
+    if not model:
+        yield "I'm currently unavailable. Please try again later."
+        return
+
+    prompt = _chat_prompt(user_message, chat_history)
+
+    stream = _stream_async(model, prompt)
+    streamed_any = False
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        async for text in stream:
+            streamed_any = True
+            yield text
     except Exception as e:
-        return "I'm having trouble responding right now. Please try again."
+        if not streamed_any:
+            yield CHAT_ERROR_MESSAGE
+    finally:
+        # Release the request slot now even if the reader stopped early
+        await stream.aclose()
+
+def generate_chat_response_stream(user_message: str, chat_history: list, language: str = 'en'):
+    """Stream the health assistant's reply as text chunks arrive"""
+    return iterate_sync(generate_chat_response_stream_async(user_message, chat_history, language))
 
-def generate_medical_report(user_profile: dict, health_logs: list, triage_history: list, language: str = 'en') -> str:
+async def generate_medical_report_async(user_profile: dict, health_logs: list, triage_history: list, language: str = 'en',
+                                       use_cache: bool = True) -> str:
     """Generate a comprehensive medical report"""
     model = setup_gemini_model()
     if not model:
         return "Unable to generate report at this time. Please try again later."
-    
+
     # Prepare minimal data for report generation
     profile_text = f"""
 Name: {user_profile.get('full_name', 'Not provided')}
@@ -142,15 +483,15 @@ Allergies: {user_profile.get('allergies', 'None')}
 Medications: {user_profile.get('medications', 'None')}
 Conditions: {user_profile.get('chronic_conditions', 'None')}
 """
-    
-    # Use only last 5 logs for faster processing
-    logs_text = "\n".join([f"{log['date']}: {log['symptoms'][:100]}{'...' if len(log['symptoms']) > 100 else ''}" 
-                          for log in health_logs[-5:]])
-    
-    # Use only last 3 triage results
-    triage_text = "\n".join([f"{result['created_at']}: {result['triage_level']}" 
-                            for result in triage_history[-3:]])
-    
+
+    # Use only the latest 5 logs for faster processing (rows are newest first)
+    logs_text = "\n".join([f"{log['date']}: {log['symptoms'][:100]}{'...' if len(log['symptoms']) > 100 else ''}"
+                          for log in health_logs[:5]])
+
+    # Use only the latest 3 triage results
+    triage_text = "\n".join([f"{result['created_at']}: {result['triage_level']}"
+                            for result in triage_history[:3]])
+
     prompt = f"""
 Create a brief medical report in the same language as the symptoms data.
 
@@ -172,31 +513,137 @@ Generate a very concise report with:
 
 Keep it extremely brief and professional.
 """
-    
+
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return await _generate_async(model, prompt, use_cache=use_cache)
     except Exception as e:
-        return "Error generating report. Please try again."
+        return REPORT_ERROR_MESSAGE
 
-def detect_language(text: str) -> str:
-    """Detect language from text using Gemini"""
+def generate_medical_report(user_profile: dict, health_logs: list, triage_history: list, language: str = 'en',
+                            use_cache: bool = True) -> str:
+    """Generate a comprehensive medical report"""
+    return run_sync(generate_medical_report_async(user_profile, health_logs, triage_history, language, use_cache))
+
+async def _detect_language_with_model(text: str, default: str = 'en') -> str:
+    """Ask Gemini for the language code of text"""
     model = setup_gemini_model()
     if not model:
-        return 'en'  # Default to English if model not available
-    
+        return default  # Default if model not available
+
     # Use shorter text sample for faster detection
     short_text = text[:200]  # Only use first 200 characters
-    
+
     prompt = f"""
 Detect language of this text. Return ONLY the language code (en, es, fr, etc.):
 {short_text}
 
 Language code:
 """
-    
+
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip().lower()[:2]  # Only take first 2 chars
+        response_text = await _generate_async(model, prompt)
+        return response_text.strip().lower()[:2]  # Only take first 2 chars
     except:
-        return 'en'  # Default to English on error
\ No newline at end of file
+        return default  # Default on error
+
+async def detect_language_async(text: str) -> str:
+    """Detect language from text, asking Gemini only when the local detector is unsure"""
+    language, confidence = detect_language_local(text)
+    if confidence >= LANGUAGE_DETECTION_MIN_CONFIDENCE:
+        return language
+    return await _detect_language_with_model(text, default=language)
+
+def detect_language(text: str) -> str:
+    """Detect language from text, asking Gemini only when the local detector is unsure"""
+    return run_sync(detect_language_async(text))
+
+# Structured-output schema for analyze_checkin
+CHECKIN_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "severity_score": {"type": "integer"},
+        "language": {"type": "string", "enum": list(LANGUAGES)},
+        "triage_level": {"type": "string", "enum": list(TRIAGE_LEVELS)},
+        "confidence": {"type": "string", "enum": ["Low", "Medium", "High"]},
+        "reasoning": {"type": "string"},
+        "recommended_action": {"type": "string"},
+        "detailed_analysis": {"type": "string"}
+    },
+    "required": ["severity_score", "language", "triage_level", "confidence",
+                 "reasoning", "recommended_action", "detailed_analysis"]
+}
+
+def _validate_checkin_analysis(data: dict) -> dict:
+    """Check a check-in analysis against CHECKIN_ANALYSIS_SCHEMA and normalize it"""
+    if not isinstance(data, dict):
+        raise ValueError("Check-in analysis must be a JSON object")
+
+    missing = [field for field in CHECKIN_ANALYSIS_SCHEMA["required"] if field not in data]
+    if missing:
+        raise ValueError(f"Check-in analysis is missing fields: {', '.join(missing)}")
+
+    analysis = {field: data[field] for field in CHECKIN_ANALYSIS_SCHEMA["required"]}
+    analysis["severity_score"] = max(0, min(100, int(analysis["severity_score"])))
+    analysis["language"] = str(analysis["language"]).strip().lower()[:2]
+
+    for field in ("language", "triage_level", "confidence"):
+        allowed = CHECKIN_ANALYSIS_SCHEMA["properties"][field]["enum"]
+        if analysis[field] not in allowed:
+            raise ValueError(f"Invalid {field}: {analysis[field]!r}")
+    for field in ("reasoning", "recommended_action", "detailed_analysis"):
+        analysis[field] = str(analysis[field])
+
+    return analysis
+
+def _parse_checkin_analysis(response_text: str) -> dict:
+    return _validate_checkin_analysis(_parse_json_response(response_text))
+
+async def analyze_checkin_async(symptoms: str, use_cache: bool = True) -> dict:
+    """Severity score, language and triage assessment from a single model call"""
+    language, _ = detect_language_local(symptoms)
+    fallback = {
+        "severity_score": 50,
+        "language": language,
+        "triage_level": "self-monitor",
+        "confidence": "Medium",
+        "reasoning": "System temporarily unavailable",
+        "recommended_action": "Please consult a healthcare professional",
+        "detailed_analysis": "Unable to generate detailed analysis"
+    }
+
+    model = setup_gemini_model()
+    if not model:
+        return fallback
+
+    prompt = f"""
+As a medical triage assistant, analyze these symptoms:
+{symptoms}
+
+Respond with a JSON object containing ONLY these fields:
+- "severity_score": integer from 0 (perfect health) to 100 (critical condition)
+- "language": two-letter code of the language the symptoms are written in ({", ".join(LANGUAGES)})
+- "triage_level": "self-monitor" or "visit-doctor"
+- "confidence": "Low", "Medium", or "High"
+- "reasoning": Brief explanation (1-2 sentences)
+- "recommended_action": Concise next steps (1-2 sentences)
+- "detailed_analysis": More detailed medical analysis (2-3 sentences)
+
+Write the text fields in the same language as the user's symptoms.
+Keep responses concise and to the point.
+"""
+
+    try:
+        return await _generate_async(
+            model, prompt, use_cache=use_cache, parse=_parse_checkin_analysis,
+            generation_config={
+                "response_mime_type": "application/json",
+                "response_schema": CHECKIN_ANALYSIS_SCHEMA
+            },
+            hedge=GEMINI_HEDGING_ENABLED
+        )
+    except Exception as e:
+        return {**fallback, "reasoning": ANALYSIS_ERROR_REASONING}
+
+def analyze_checkin(symptoms: str, use_cache: bool = True) -> dict:
+    """Severity score, language and triage assessment from a single model call"""
+    return run_sync(analyze_checkin_async(symptoms, use_cache))
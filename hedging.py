@@ -0,0 +1,128 @@
+import asyncio
+from collections import deque
+from typing import Any, Dict
+
+
+class HedgePolicy:
+    """Decides when to send a backup request and how many backups we can afford
+
+    The hedge delay is the configured percentile of recent latencies (a
+    fixed warm-up delay until enough samples exist). Every primary request
+    earns ``budget`` of a hedge token and every hedge spends a whole one,
+    so backups stay under that fraction of traffic even when upstream is
+    slow across the board.
+    """
+
+    def __init__(self, percentile: float = 95, budget: float = 0.1, warmup_delay: float = 2.0,
+                 min_delay: float = 0.05, window: int = 200, min_samples: int = 20):
+        self.percentile = percentile
+        self.budget = budget
+        self.warmup_delay = warmup_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._tokens = 0.0
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.over_budget = 0
+        self.latency_saved_seconds = 0.0
+
+    def record_latency(self, seconds: float):
+        self._latencies.append(seconds)
+
+    def delay(self) -> float:
+        """Seconds to wait for the primary before hedging"""
+        if len(self._latencies) < self.min_samples:
+            return self.warmup_delay
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay, ordered[index])
+
+    def start_request(self):
+        self.requests += 1
+        # Cap the balance so a quiet period can't fund a burst of hedges
+        self._tokens = min(self._tokens + self.budget, max(1.0, self.budget * 10))
+
+    def try_spend(self) -> bool:
+        """Take a hedge token if the budget allows one"""
+        if self._tokens >= 1:
+            self._tokens -= 1
+            self.hedged += 1
+            return True
+        self.over_budget += 1
+        return False
+
+    def refund(self):
+        """The backup was not sent after all; return its token"""
+        self._tokens += 1
+        self.hedged -= 1
+
+    def record_hedge_win(self, elapsed: float):
+        """The backup answered first, elapsed seconds after the primary started
+
+        The primary was cancelled, so its latency is estimated as the mean
+        of recent latencies longer than elapsed.
+        """
+        self.hedge_wins += 1
+        slower = [latency for latency in self._latencies if latency > elapsed]
+        if slower:
+            self.latency_saved_seconds += sum(slower) / len(slower) - elapsed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'hedged': self.hedged,
+            'hedge_rate': round(self.hedged / self.requests, 4) if self.requests else 0.0,
+            'hedge_wins': self.hedge_wins,
+            'over_budget': self.over_budget,
+            'hedge_delay_seconds': round(self.delay(), 3),
+            'estimated_latency_saved_seconds': round(self.latency_saved_seconds, 3),
+        }
+
+
+async def hedged_call(policy: HedgePolicy, request, before_hedge=None):
+    """Await request(); if it is slower than policy.delay(), race it against a second request()
+
+    The first successful answer wins and the other request is cancelled.
+    If both fail, the primary's error is raised. before_hedge (a
+    coroutine function) runs before the backup is sent, e.g. to take a
+    rate-limiter token; if the primary finishes first the backup is skipped.
+    """
+    loop = asyncio.get_running_loop()
+    policy.start_request()
+    started = loop.time()
+    primary = asyncio.ensure_future(request())
+    tasks = {primary}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=policy.delay())
+        if not done and policy.try_spend():
+            if before_hedge is not None:
+                # A throttled wait must not hold up a primary that answers meanwhile
+                waiting = asyncio.ensure_future(before_hedge())
+                tasks.add(waiting)
+                await asyncio.wait({primary, waiting}, return_when=asyncio.FIRST_COMPLETED)
+                tasks.discard(waiting)
+                if not primary.done() and waiting.done() and waiting.exception() is None:
+                    tasks.add(asyncio.ensure_future(request()))
+                else:
+                    waiting.cancel()
+                    policy.refund()
+            else:
+                tasks.add(asyncio.ensure_future(request()))
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is None:
+                    elapsed = loop.time() - started
+                    policy.record_latency(elapsed)
+                    if task is not primary:
+                        policy.record_hedge_win(elapsed)
+                    return task.result()
+        return primary.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,123 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, Tuple
+
+from config import LANGUAGES
+
+# Seed text for each Latin-script language. Character trigram profiles are
+# built from these once at import; they lean on everyday health vocabulary
+# because that is what users type into the check-in and triage forms.
+_SEED_TEXT = {
+    'en': """I have had a headache and a sore throat since yesterday and I feel very tired.
+        My stomach hurts after eating and I could not sleep well last night. The pain is
+        worse in the morning, and I also have a mild fever with some coughing. What should
+        I do about these symptoms? I think it is getting better but my back still hurts
+        when I walk. She has been feeling dizzy and weak for the past few days. We are
+        worried because the medicine does not seem to help with the nausea.""",
+    'es': """Tengo dolor de cabeza y de garganta desde ayer y me siento muy cansado. Me duele
+        el estómago después de comer y no pude dormir bien anoche. El dolor es peor por la
+        mañana y también tengo un poco de fiebre con tos. ¿Qué debo hacer con estos
+        síntomas? Creo que estoy mejorando pero todavía me duele la espalda cuando camino.
+        Ella se ha sentido mareada y débil durante los últimos días. Estamos preocupados
+        porque la medicina no parece ayudar con las náuseas.""",
+    'fr': """J'ai mal à la tête et à la gorge depuis hier et je me sens très fatigué. J'ai
+        mal au ventre après avoir mangé et je n'ai pas bien dormi la nuit dernière. La
+        douleur est pire le matin et j'ai aussi un peu de fièvre avec de la toux. Que dois-je
+        faire pour ces symptômes? Je pense que ça va mieux mais mon dos me fait encore mal
+        quand je marche. Elle se sent étourdie et faible depuis quelques jours. Nous sommes
+        inquiets parce que le médicament ne semble pas aider contre les nausées.""",
+    'de': """Ich habe seit gestern Kopfschmerzen und Halsschmerzen und fühle mich sehr müde.
+        Mein Bauch tut nach dem Essen weh und ich konnte letzte Nacht nicht gut schlafen.
+        Der Schmerz ist am Morgen schlimmer und ich habe auch leichtes Fieber mit etwas
+        Husten. Was soll ich bei diesen Symptomen tun? Ich glaube, es wird besser, aber mein
+        Rücken tut immer noch weh, wenn ich gehe. Sie fühlt sich seit einigen Tagen
+        schwindelig und schwach. Wir sind besorgt, weil das Medikament nicht gegen die
+        Übelkeit zu helfen scheint.""",
+    'it': """Ho mal di testa e mal di gola da ieri e mi sento molto stanco. Mi fa male lo
+        stomaco dopo aver mangiato e non sono riuscito a dormire bene la notte scorsa. Il
+        dolore è peggiore la mattina e ho anche un po' di febbre con la tosse. Cosa devo
+        fare per questi sintomi? Penso che stia migliorando ma la schiena mi fa ancora male
+        quando cammino. Lei si sente stordita e debole da qualche giorno. Siamo preoccupati
+        perché la medicina non sembra aiutare con la nausea.""",
+    'pt': """Estou com dor de cabeça e dor de garganta desde ontem e me sinto muito cansado.
+        Minha barriga dói depois de comer e não consegui dormir bem ontem à noite. A dor é
+        pior de manhã e também tenho um pouco de febre com tosse. O que devo fazer com esses
+        sintomas? Acho que estou melhorando, mas minhas costas ainda doem quando eu ando.
+        Ela tem se sentido tonta e fraca nos últimos dias. Estamos preocupados porque o
+        remédio não parece ajudar com o enjoo.""",
+}
+
+# Unicode ranges for languages identified by script alone
+_DEVANAGARI = re.compile(r'[\u0900-\u097F]')
+_KANA = re.compile(r'[\u3040-\u30FF\u31F0-\u31FF]')
+_HAN = re.compile(r'[\u4E00-\u9FFF\u3400-\u4DBF]')
+_LETTERS = re.compile(r'[^\W\d_]')
+
+# Only the most frequent trigrams carry signal; the long tail is mostly noise
+_PROFILE_SIZE = 300
+
+def _trigrams(text: str) -> Counter:
+    """Count character trigrams of each word, padded with spaces at the edges"""
+    counts = Counter()
+    for word in re.findall(r"[^\W\d_]+(?:'[^\W\d_]+)?", text.lower()):
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            counts[padded[i:i + 3]] += 1
+    return counts
+
+def _build_profile(text: str) -> Tuple[Dict[str, float], float]:
+    counts = dict(_trigrams(text).most_common(_PROFILE_SIZE))
+    norm = math.sqrt(sum(v * v for v in counts.values()))
+    return counts, norm
+
+_PROFILES = {code: _build_profile(text) for code, text in _SEED_TEXT.items() if code in LANGUAGES}
+
+def _script_language(text: str) -> Tuple[str, float]:
+    """Identify languages with a dedicated script; returns ('', 0) for Latin text"""
+    letters = len(_LETTERS.findall(text))
+    if not letters:
+        return '', 0.0
+
+    devanagari = len(_DEVANAGARI.findall(text))
+    kana = len(_KANA.findall(text))
+    han = len(_HAN.findall(text))
+
+    if devanagari / letters > 0.3:
+        return 'hi', min(1.0, devanagari / letters + 0.3)
+    if kana and (kana + han) / letters > 0.3:
+        # Japanese mixes kana with kanji; Chinese never uses kana
+        return 'ja', min(1.0, (kana + han) / letters + 0.3)
+    if han / letters > 0.3:
+        return 'zh', min(1.0, han / letters + 0.3)
+    return '', 0.0
+
+def detect_language_local(text: str) -> Tuple[str, float]:
+    """Detect the language of text offline; returns (language code, confidence 0-1)"""
+    sample = text[:500]
+
+    code, confidence = _script_language(sample)
+    if code:
+        return code, confidence
+
+    grams = _trigrams(sample)
+    if not grams:
+        return 'en', 0.0
+
+    norm = math.sqrt(sum(v * v for v in grams.values()))
+    scores = []
+    for lang, (profile, profile_norm) in _PROFILES.items():
+        dot = sum(count * profile.get(gram, 0) for gram, count in grams.items())
+        scores.append((dot / (norm * profile_norm), lang))
+    scores.sort(reverse=True)
+
+    best_score, best_lang = scores[0]
+    second_score = scores[1][0] if len(scores) > 1 else 0.0
+    if best_score <= 0:
+        return 'en', 0.0
+
+    # Confidence is the relative margin over the runner-up, damped for very
+    # short inputs where a couple of shared trigrams can swing the result
+    margin = (best_score - second_score) / best_score
+    length_factor = min(1.0, sum(grams.values()) / 40)
+    return best_lang, round(margin * length_factor, 3)
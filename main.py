@@ -2,27 +2,28 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, date, timedelta
 import time
-import sqlite3
 
 # Import our modules
 from database import (
     create_user, authenticate_user, update_user_profile, get_user_profile,
-    add_health_log, get_health_logs, add_triage_result, get_triage_history,
-    get_streak_data, create_chat_session, add_chat_message, get_chat_history
+    add_health_log, delete_daily_checkin, get_health_logs, get_health_logs_page,
+    add_triage_result, get_triage_history, get_triage_history_between,
+    get_streak_data, create_chat_session, add_chat_message, get_chat_history_page,
+    get_daily_severity_aggregates, get_hourly_severity_aggregates, get_data_version
 )
 from gemini_client import (
-    evaluate_health_score, generate_triage_assessment, 
-    generate_chat_response, detect_language
+    generate_chat_response, generate_chat_response_stream, detect_language, analyze_checkin
 )
 from visualization import (
     create_health_trends_chart, create_streak_visualization,
-    create_triage_distribution_chart, create_daily_patterns_chart
+    create_triage_distribution_chart, create_daily_patterns_chart, get_cached_figure
 )
-from report_generator import generate_pdf_report, export_health_data
-from config import LANGUAGES, TRIAGE_LEVELS
+from report_generator import export_health_data_bytes, EXPORT_FORMATS
+from report_jobs import submit_report_job, get_report_job, get_report_job_result
+from config import LANGUAGES, TRIAGE_LEVELS, CHAT_PAGE_SIZE, HEALTH_TABLE_PAGE_SIZE
 from models import init_database
 
-# Initialize database
+# Initialize database (only does work on the first run in this process)
 init_database()
 
 # Page configuration
@@ -83,6 +84,17 @@ if 'is_health_related' not in st.session_state:
     st.session_state.is_health_related = True
 if 'processing' not in st.session_state:
     st.session_state.processing = False
+if 'report_job_id' not in st.session_state:
+    st.session_state.report_job_id = None
+if 'chat_pages_loaded' not in st.session_state:
+    st.session_state.chat_pages_loaded = 1
+if 'health_table_pages' not in st.session_state:
+    st.session_state.health_table_pages = 1
+
+def start_chat_session():
+    """Open a new chat session for the current user, starting from its latest page"""
+    st.session_state.chat_session_id = create_chat_session(st.session_state.user_id)
+    st.session_state.chat_pages_loaded = 1
 
 # Authentication functions
 def show_login_page():
@@ -167,6 +179,8 @@ def show_dashboard():
     st.sidebar.markdown("---")
     if st.sidebar.button("Logout"):
         st.session_state.user_id = None
+        st.session_state.chat_session_id = None
+        st.session_state.chat_pages_loaded = 1
         st.session_state.current_page = "login"
         st.rerun()
 
@@ -256,14 +270,7 @@ def show_daily_checkin():
         
         if st.button("Update Today's Entry"):
             # Delete the existing entry and show the form again
-            conn = sqlite3.connect('health_tracker.db')
-            c = conn.cursor()
-            c.execute("DELETE FROM health_logs WHERE user_id = ? AND date = ?", 
-                     (st.session_state.user_id, today))
-            c.execute("DELETE FROM daily_streaks WHERE user_id = ? AND date = ?", 
-                     (st.session_state.user_id, today))
-            conn.commit()
-            conn.close()
+            delete_daily_checkin(st.session_state.user_id, today)
             st.rerun()
     else:
         with st.form("daily_checkin_form"):
@@ -278,8 +285,9 @@ def show_daily_checkin():
             submitted = st.form_submit_button("Submit Daily Check-in")
             
             if submitted and symptoms:
-                # Evaluate health score
-                severity_score = evaluate_health_score(symptoms)
+                # Evaluate health score (the same call also triages, so a
+                # follow-up triage of these symptoms is served from cache)
+                severity_score = analyze_checkin(symptoms)['severity_score']
                 
                 # Add to database
                 add_health_log(st.session_state.user_id, symptoms, notes, severity_score)
@@ -321,8 +329,9 @@ def show_symptom_triage():
     if submitted and symptoms:
         st.session_state.processing = True
         try:
-            language = detect_language(symptoms)
-            assessment = generate_triage_assessment(symptoms, language)
+            # One structured call returns the language and the triage assessment
+            assessment = analyze_checkin(symptoms)
+            language = assessment['language']
 
             # Save to database
             add_triage_result(
@@ -359,12 +368,13 @@ def show_symptom_triage():
         st.write("Would you like to discuss these symptoms with our health assistant?")
         if st.button("Chat with Health Assistant about these symptoms", key="chat_about_symptoms"):
             if not st.session_state.chat_session_id:
-                st.session_state.chat_session_id = create_chat_session(st.session_state.user_id)
+                start_chat_session()
 
             add_chat_message(st.session_state.chat_session_id, "user",
                              f"I'm experiencing these symptoms: {symptoms}")
 
-            chat_history = get_chat_history(st.session_state.chat_session_id)
+            # The assistant only looks at the last few messages
+            chat_history, _ = get_chat_history_page(st.session_state.chat_session_id, 3)
             response = generate_chat_response(
                 f"I'm experiencing these symptoms: {symptoms}",
                 chat_history,
@@ -380,14 +390,26 @@ def show_health_assistant():
     
     # Initialize chat session if needed
     if not st.session_state.chat_session_id:
-        st.session_state.chat_session_id = create_chat_session(st.session_state.user_id)
-    
-    # Get chat history
-    chat_history = get_chat_history(st.session_state.chat_session_id)
+        start_chat_session()
+    
+    # Get the latest page of chat history, plus any older pages the user asked for
+    chat_history, older_cursor = get_chat_history_page(st.session_state.chat_session_id, CHAT_PAGE_SIZE)
+    for _ in range(st.session_state.chat_pages_loaded - 1):
+        if older_cursor is None:
+            break
+        older_messages, older_cursor = get_chat_history_page(
+            st.session_state.chat_session_id, CHAT_PAGE_SIZE, older_cursor
+        )
+        chat_history = older_messages + chat_history
     
     # Display chat history using Streamlit's native chat elements
     st.subheader("Conversation History")
     
+    if older_cursor is not None:
+        if st.button("Load older messages"):
+            st.session_state.chat_pages_loaded += 1
+            st.rerun()
+    
     if not chat_history:
         st.info("Start a conversation with our health assistant. You can ask questions about symptoms, medications, general health advice, and more.")
     else:
@@ -411,28 +433,22 @@ def show_health_assistant():
         with st.chat_message("user"):
             st.markdown(user_input)
         
-        # Generate response
-        with st.spinner("Health assistant is thinking..."):
-            language = detect_language(user_input)
-            response = generate_chat_response(user_input, chat_history, language)
-            
-            # Add assistant response to chat
-            add_chat_message(st.session_state.chat_session_id, "assistant", response)
-            
-            # Display assistant response
-            with st.chat_message("assistant"):
-                st.markdown(response)
-            
-            # Rerun to update the chat display
-            st.rerun()
+        # Stream the response into the chat as it is generated
+        language = detect_language(user_input)
+        with st.chat_message("assistant"):
+            response = st.write_stream(
+                generate_chat_response_stream(user_input, chat_history, language)
+            )
+        
+        # Add assistant response to chat once the stream is complete
+        add_chat_message(st.session_state.chat_session_id, "assistant", response.strip())
+        
+        # Rerun to update the chat display
+        st.rerun()
 
 def show_health_trends():
     st.title("📊 Health Trends & Analytics")
     
-    # Get health data
-    health_logs = get_health_logs(st.session_state.user_id, 365)  # Last year
-    triage_history = get_triage_history(st.session_state.user_id, 100)  # Last 100 triage results
-    
     # Time filter
     time_filter = st.selectbox("Time Range", ["Last 7 days", "Last 30 days", "Last 90 days", "Last year", "All time"])
     
@@ -446,41 +462,75 @@ def show_health_trends():
     elif time_filter == "Last year":
         cutoff_date = (datetime.now() - timedelta(days=365)).date().isoformat()
     else:  # All time
-        cutoff_date = "2000-01-01"  # Arbitrary early date
+        cutoff_date = None
     
-    filtered_logs = [log for log in health_logs if log['date'] >= cutoff_date]
+    # Figures are cached per user, time range and data version; each build
+    # function fetches its own data, so a rerun with nothing new written
+    # skips the queries and the plotting. Only the selected range is read
+    # (filtered in SQL), and charts use the precomputed severity buckets.
+    user_id = st.session_state.user_id
+    cache_key = (user_id, time_filter, cutoff_date, get_data_version(user_id))
     
     # Display charts with unique keys to prevent duplicate element errors
     col1, col2 = st.columns(2)
     
     with col1:
-        st.plotly_chart(create_health_trends_chart(filtered_logs, "health_trends"), 
-                       use_container_width=True, key="health_trends_chart")
+        health_trends = get_cached_figure(
+            ('health_trends',) + cache_key,
+            lambda: create_health_trends_chart(
+                get_daily_severity_aggregates(user_id, cutoff_date), "health_trends"))
+        st.plotly_chart(health_trends, use_container_width=True, key="health_trends_chart")
     
     with col2:
-        streak_data = get_streak_data(st.session_state.user_id)
-        st.plotly_chart(create_streak_visualization(streak_data, "streak_data"), 
-                       use_container_width=True, key="streak_chart")
+        # The current streak also depends on today's date
+        streak_chart = get_cached_figure(
+            ('streak_data', date.today()) + cache_key,
+            lambda: create_streak_visualization(get_streak_data(user_id), "streak_data"))
+        st.plotly_chart(streak_chart, use_container_width=True, key="streak_chart")
     
     col3, col4 = st.columns(2)
     
     with col3:
-        st.plotly_chart(create_triage_distribution_chart(triage_history, "triage_distribution"), 
-                       use_container_width=True, key="triage_chart")
+        triage_chart = get_cached_figure(
+            ('triage_distribution',) + cache_key,
+            lambda: create_triage_distribution_chart(
+                get_triage_history_between(user_id, cutoff_date, columnar=True), "triage_distribution"))
+        st.plotly_chart(triage_chart, use_container_width=True, key="triage_chart")
     
     with col4:
-        st.plotly_chart(create_daily_patterns_chart(health_logs, "daily_patterns"), 
-                       use_container_width=True, key="patterns_chart")
+        patterns_chart = get_cached_figure(
+            ('daily_patterns',) + cache_key,
+            lambda: create_daily_patterns_chart(get_hourly_severity_aggregates(user_id), "daily_patterns"))
+        st.plotly_chart(patterns_chart, use_container_width=True, key="patterns_chart")
     
-    # Data table
+    # Data table: the latest page of the range, plus any older pages the user asked for
     st.subheader("Raw Health Data")
-    if health_logs:
-        df = pd.DataFrame(health_logs)
-        st.dataframe(df[['date', 'symptoms', 'severity_score', 'notes']], 
-                    use_container_width=True)
+    if st.session_state.get('health_table_range') != time_filter:
+        st.session_state.health_table_range = time_filter
+        st.session_state.health_table_pages = 1
+    # Cached like the figures; bounded by the pages shown, not the size of the range
+    pages = st.session_state.health_table_pages
+    raw_table, has_more = get_cached_figure(
+        ('raw_table', pages) + cache_key, lambda: _raw_health_table(user_id, cutoff_date, pages))
+    if not raw_table.empty:
+        st.dataframe(raw_table, use_container_width=True)
+        if has_more and st.button("Load more"):
+            st.session_state.health_table_pages += 1
+            st.rerun()
     else:
         st.info("No health data available yet.")
 
+def _raw_health_table(user_id: int, cutoff_date, pages: int):
+    """The first pages of health logs in the range as a DataFrame, and whether more exist"""
+    health_logs, cursor = [], None
+    for _ in range(pages):
+        page, cursor = get_health_logs_page(user_id, HEALTH_TABLE_PAGE_SIZE, cursor, cutoff_date)
+        health_logs.extend(page)
+        if cursor is None:
+            break
+    columns = ['date', 'symptoms', 'severity_score', 'notes']
+    return pd.DataFrame(health_logs, columns=columns), cursor is not None
+
 def show_medical_reports():
     st.title("📋 Medical Reports & Export")
     
@@ -495,39 +545,53 @@ def show_medical_reports():
         end_date = st.date_input("End Date", value=datetime.now())
         
         if st.button("Generate PDF Report"):
-            with st.spinner("Generating report..."):
-                report_data = generate_pdf_report(
-                    st.session_state.user_id, 
-                    start_date.isoformat(), 
-                    end_date.isoformat()
-                )
+            # Generated by a background worker; identical requests share one job
+            st.session_state.report_job_id = submit_report_job(
+                st.session_state.user_id, 
+                start_date.isoformat(), 
+                end_date.isoformat()
+            )
+        
+        job = get_report_job(st.session_state.report_job_id) if st.session_state.report_job_id else None
+        if job and job['user_id'] == st.session_state.user_id:
+            if job['status'] in ('queued', 'running'):
+                st.info(f"Generating report for {job['start_date']} to {job['end_date']}...")
+                # Poll the job status until the worker finishes
+                time.sleep(1)
+                st.rerun()
+            elif job['status'] == 'done':
+                report_data = get_report_job_result(job['id'])
                 
                 if isinstance(report_data, bytes):
                     st.download_button(
                         label="Download PDF Report",
                         data=report_data,
-                        file_name=f"health_report_{start_date}_{end_date}.pdf",
+                        file_name=f"health_report_{job['start_date']}_{job['end_date']}.pdf",
                         mime="application/pdf"
                     )
                 else:
                     # Fallback: show HTML content
                     with st.expander("View Report Content"):
                         st.components.v1.html(report_data, height=600, scrolling=True)
+            else:
+                st.error(f"Report generation failed: {job['error']}")
     
     with col2:
         st.subheader("Export Health Data")
         
-        export_format = st.selectbox("Export Format", ["CSV", "JSON"])
+        export_format = st.selectbox("Export Format", ["CSV", "JSON", "NDJSON"])
+        compress = st.checkbox("Compress (gzip)")
         
-        if st.button(f"Export as {export_format}"):
-            data = export_health_data(st.session_state.user_id, export_format.lower())
-            
-            st.download_button(
-                label=f"Download {export_format}",
-                data=data,
-                file_name=f"health_data_export.{export_format.lower()}",
-                mime="text/csv" if export_format.lower() == "csv" else "application/json"
-            )
+        # Built only when the button is clicked, streamed from the database with no row limit
+        extension, mime = EXPORT_FORMATS[export_format.lower()]
+        user_id = st.session_state.user_id
+        format_type = export_format.lower()
+        st.download_button(
+            label=f"Export as {export_format}",
+            data=lambda: export_health_data_bytes(user_id, format_type, compress),
+            file_name=f"health_data_export.{extension}" + (".gz" if compress else ""),
+            mime="application/gzip" if compress else mime
+        )
     
     # Recent reports section
     st.markdown("---")
@@ -0,0 +1,76 @@
+import argparse
+
+from bulk_export import EXPORT_FORMATS, default_export_format, export_all
+from config import EXPORT_BATCH_SIZE, EXPORT_ROWS_PER_FILE
+from models import init_database
+from synthetic_data import generate_synthetic_data
+from database import rebuild_streak_summaries, rebuild_severity_aggregates
+
+
+def cmd_rebuild_streaks(args):
+    """Recompute the materialized streak summaries from daily_streaks"""
+    count = rebuild_streak_summaries(args.user_id)
+    print(f"Rebuilt streak summaries for {count} user(s)")
+
+
+def cmd_rebuild_aggregates(args):
+    """Recompute the daily and hourly severity aggregates from health_logs"""
+    count = rebuild_severity_aggregates(args.user_id)
+    print(f"Rebuilt {count} severity aggregate bucket(s)")
+
+
+def cmd_export_all(args):
+    """Dump all users' logs, triage results, chat messages and streaks for analytics"""
+    summary = export_all(args.output, args.format, args.batch_size, args.rows_per_file)
+    for table, result in summary.items():
+        rate = result['rows'] / result['seconds'] if result['seconds'] else 0
+        print(f"{table}: {result['rows']} rows in {len(result['files'])} file(s), "
+              f"{rate:,.0f} rows/sec")
+
+
+def cmd_seed(args):
+    """Fill the database with reproducible synthetic users and history"""
+    counts = generate_synthetic_data(args.users, args.days, chat_sessions_per_user=args.chat_sessions,
+                                     messages_per_session=args.messages, seed=args.seed)
+    print(", ".join(f"{count} {table}" for table, count in counts.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Health Tracker maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subparsers.add_parser("rebuild-streaks", help="Recompute streak summaries for all users")
+    rebuild.add_argument("--user-id", type=int, default=None, help="Only rebuild this user")
+    rebuild.set_defaults(func=cmd_rebuild_streaks)
+
+    aggregates = subparsers.add_parser("rebuild-aggregates",
+                                       help="Recompute severity aggregates for all users")
+    aggregates.add_argument("--user-id", type=int, default=None, help="Only rebuild this user")
+    aggregates.set_defaults(func=cmd_rebuild_aggregates)
+
+    export = subparsers.add_parser("export-all",
+                                   help="Export all users' data as Parquet, Arrow IPC or gzip NDJSON")
+    export.add_argument("output", help="Directory to write one subdirectory per table into")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default=default_export_format(),
+                        help="Output format (default: %(default)s)")
+    export.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE,
+                        help="Rows fetched per batch (default: %(default)s)")
+    export.add_argument("--rows-per-file", type=int, default=EXPORT_ROWS_PER_FILE,
+                        help="Rows per output part file (default: %(default)s)")
+    export.set_defaults(func=cmd_export_all)
+
+    seed = subparsers.add_parser("seed", help="Generate synthetic users, logs, streaks and chats")
+    seed.add_argument("--users", type=int, default=100)
+    seed.add_argument("--days", type=int, default=365, help="Days of history per user")
+    seed.add_argument("--chat-sessions", type=int, default=2, help="Chat sessions per user")
+    seed.add_argument("--messages", type=int, default=100, help="Messages per chat session")
+    seed.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same data)")
+    seed.set_defaults(func=cmd_seed)
+
+    args = parser.parse_args()
+    init_database()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
 import sqlite3
+import threading
 from datetime import datetime
 
-def init_database():
-    """Initialize SQLite database with all required tables"""
-    conn = sqlite3.connect('health_tracker.db')
-    c = conn.cursor()
-    
+from db_connection import get_connection, get_pool
+
+def _create_base_tables(c):
+    """Version 1: the original application tables"""
     # Users table
     c.execute('''CREATE TABLE IF NOT EXISTS users
                  (id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -74,9 +74,179 @@ def init_database():
                   created_at TEXT NOT NULL,
                   FOREIGN KEY (user_id) REFERENCES users (id),
                   UNIQUE(user_id, date))''')
-    
-    conn.commit()
-    conn.close()
 
-# Initialize database when this module is imported
-init_database()
\ No newline at end of file
+def _add_query_indexes(c):
+    """Version 2: composite indexes matching the hot per-user queries"""
+    # get_health_logs / check-in lookups: WHERE user_id = ? ORDER BY date DESC
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_health_logs_user_date
+                 ON health_logs (user_id, date DESC)''')
+
+    # get_triage_history: WHERE user_id = ? ORDER BY created_at DESC
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_triage_results_user_created
+                 ON triage_results (user_id, created_at DESC)''')
+
+    # get_chat_history: WHERE session_id = ? ORDER BY timestamp
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_chat_messages_session_timestamp
+                 ON chat_messages (session_id, timestamp)''')
+
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_chat_sessions_user
+                 ON chat_sessions (user_id, created_at DESC)''')
+
+    # get_streak_data: covers WHERE user_id = ? AND completed = 1 ORDER BY date DESC
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_daily_streaks_user_completed_date
+                 ON daily_streaks (user_id, completed, date DESC)''')
+
+def _add_streak_summaries(c):
+    """Version 3: materialized per-user streak summary kept current on write"""
+    c.execute('''CREATE TABLE IF NOT EXISTS streak_summaries
+                 (user_id INTEGER PRIMARY KEY,
+                  current_streak INTEGER NOT NULL DEFAULT 0,
+                  longest_streak INTEGER NOT NULL DEFAULT 0,
+                  last_checkin_date TEXT,
+                  total_logs INTEGER NOT NULL DEFAULT 0,
+                  updated_at TEXT NOT NULL,
+                  FOREIGN KEY (user_id) REFERENCES users (id))''')
+
+    # Backfill from existing check-ins. This is a frozen copy of the rebuild
+    # query as of version 3, so replaying the migration never changes meaning.
+    c.execute('''WITH days AS (
+                     SELECT user_id, date,
+                            julianday(date) - ROW_NUMBER() OVER (
+                                PARTITION BY user_id ORDER BY date) AS run_key
+                     FROM daily_streaks
+                     WHERE completed = 1
+                 ),
+                 runs AS (
+                     SELECT user_id, MAX(date) AS end_date, COUNT(*) AS length
+                     FROM days GROUP BY user_id, run_key
+                 )
+                 INSERT OR REPLACE INTO streak_summaries
+                     (user_id, current_streak, longest_streak, last_checkin_date, total_logs, updated_at)
+                 SELECT user_id,
+                        (SELECT r.length FROM runs r WHERE r.user_id = runs.user_id
+                         ORDER BY r.end_date DESC LIMIT 1),
+                        MAX(length), MAX(end_date), SUM(length), ?
+                 FROM runs GROUP BY user_id''', (datetime.now().isoformat(),))
+
+def _add_report_jobs(c):
+    """Version 4: per-user data versions and the background report job queue"""
+    # Bumped by every write that changes what a user's reports or charts show
+    c.execute('''CREATE TABLE IF NOT EXISTS user_data_versions
+                 (user_id INTEGER PRIMARY KEY,
+                  version INTEGER NOT NULL DEFAULT 0,
+                  FOREIGN KEY (user_id) REFERENCES users (id))''')
+
+    # One row per distinct (user, date range, data version) report request
+    c.execute('''CREATE TABLE IF NOT EXISTS report_jobs
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  user_id INTEGER NOT NULL,
+                  start_date TEXT NOT NULL,
+                  end_date TEXT NOT NULL,
+                  data_version INTEGER NOT NULL,
+                  status TEXT NOT NULL,
+                  result BLOB,
+                  result_type TEXT,
+                  error TEXT,
+                  created_at TEXT NOT NULL,
+                  started_at TEXT,
+                  finished_at TEXT,
+                  FOREIGN KEY (user_id) REFERENCES users (id),
+                  UNIQUE(user_id, start_date, end_date, data_version))''')
+
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_report_jobs_status
+                 ON report_jobs (status, created_at)''')
+
+def _add_severity_aggregates(c):
+    """Version 5: daily and hour-of-day severity aggregates for the trend charts"""
+    c.execute('''CREATE TABLE IF NOT EXISTS severity_daily_aggregates
+                 (user_id INTEGER NOT NULL,
+                  date TEXT NOT NULL,
+                  log_count INTEGER NOT NULL,
+                  score_count INTEGER NOT NULL,
+                  score_sum REAL NOT NULL,
+                  score_min INTEGER,
+                  score_max INTEGER,
+                  PRIMARY KEY (user_id, date)) WITHOUT ROWID''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS severity_hourly_aggregates
+                 (user_id INTEGER NOT NULL,
+                  hour INTEGER NOT NULL,
+                  log_count INTEGER NOT NULL,
+                  score_count INTEGER NOT NULL,
+                  score_sum REAL NOT NULL,
+                  score_min INTEGER,
+                  score_max INTEGER,
+                  PRIMARY KEY (user_id, hour)) WITHOUT ROWID''')
+
+    # Backfill from existing health logs. These are frozen copies of the
+    # rebuild queries as of version 5, so replaying the migration cannot drift.
+    c.execute('''INSERT OR REPLACE INTO severity_daily_aggregates
+                 (user_id, date, log_count, score_count, score_sum, score_min, score_max)
+                 SELECT user_id, date, COUNT(*), COUNT(severity_score),
+                        TOTAL(severity_score), MIN(severity_score), MAX(severity_score)
+                 FROM health_logs
+                 GROUP BY user_id, date''')
+
+    c.execute('''INSERT OR REPLACE INTO severity_hourly_aggregates
+                 (user_id, hour, log_count, score_count, score_sum, score_min, score_max)
+                 SELECT user_id, CAST(substr(created_at, 12, 2) AS INTEGER), COUNT(*),
+                        COUNT(severity_score), TOTAL(severity_score),
+                        MIN(severity_score), MAX(severity_score)
+                 FROM health_logs
+                 GROUP BY user_id, CAST(substr(created_at, 12, 2) AS INTEGER)''')
+
+def _add_health_logs_keyset_index(c):
+    """Version 6: index for keyset paging of health logs"""
+    # get_health_logs_page: WHERE user_id = ? AND (date, id) < (?, ?)
+    # ORDER BY date DESC, id DESC, walked backwards without a temp B-tree
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_health_logs_user_date_id
+                 ON health_logs (user_id, date, id)''')
+
+# Ordered schema migrations; the position in this list (1-based) is the
+# version recorded in PRAGMA user_version once the step has been applied.
+# Every step must be safe to re-run against a database created before
+# versioning existed.
+MIGRATIONS = [
+    _create_base_tables,
+    _add_query_indexes,
+    _add_streak_summaries,
+    _add_report_jobs,
+    _add_severity_aggregates,
+    _add_health_logs_keyset_index,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Read the schema version stored in the database header"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations in order and return the resulting version"""
+    version = get_schema_version(conn)
+    for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        c = conn.cursor()
+        c.execute('BEGIN')
+        migration(c)
+        c.execute(f'PRAGMA user_version = {target}')
+        conn.commit()
+        print(f"Applied schema migration {target}: {migration.__name__}")
+    return get_schema_version(conn)
+
+# Database files whose schema is known to be current in this process
+_initialized_databases = set()
+_init_lock = threading.Lock()
+
+def init_database():
+    """Initialize SQLite database with all required tables (once per process)"""
+    database = get_pool().database
+    if database in _initialized_databases:
+        return
+
+    with _init_lock:
+        if database in _initialized_databases:
+            return
+        with get_connection() as conn:
+            if get_schema_version(conn) < SCHEMA_VERSION:
+                apply_migrations(conn)
+        _initialized_databases.add(database)
@@ -0,0 +1,394 @@
+import concurrent.futures
+import queue
+import subprocess
+import textwrap
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+import pdfkit
+
+from config import PDF_BACKEND, PDF_RENDER_QUEUE_SIZE, PDF_RENDER_TIMEOUT_SECONDS, PDF_RENDER_WORKERS
+
+class RenderError(Exception):
+    """A PDF could not be rendered (renderer crashed, timed out or the queue was full)"""
+
+class PDFBackend(ABC):
+    """Turns a complete HTML document into PDF bytes"""
+
+    name = 'base'
+
+    @abstractmethod
+    def render(self, html: str, timeout: float) -> bytes:
+        pass
+
+    def warm(self):
+        """Prepare the calling worker thread for its next render (default: nothing to do)"""
+
+    def release(self):
+        """Free whatever warm() prepared for the calling worker thread"""
+
+# Page setup shared by both backends: A4 with 0.75in margins
+_WKHTMLTOPDF_OPTIONS = {
+    'page-size': 'A4',
+    'margin-top': '0.75in',
+    'margin-right': '0.75in',
+    'margin-bottom': '0.75in',
+    'margin-left': '0.75in',
+    'encoding': "UTF-8",
+    'no-outline': None,
+    'background': None,
+    'enable-local-file-access': None
+}
+
+class WkhtmltopdfBackend(PDFBackend):
+    """Renders with the wkhtmltopdf binary, one subprocess per document
+
+    wkhtmltopdf has no resident/server mode, so each document needs its own
+    process. Each worker thread keeps one spare process started ahead of
+    time, blocked reading the HTML from stdin, so a render only waits for
+    the conversion and not for process startup. The next spare is started
+    as soon as a render finishes, and a hung process is killed at the
+    timeout.
+    """
+
+    name = 'wkhtmltopdf'
+
+    def __init__(self):
+        configuration = pdfkit.configuration()  # raises OSError if the binary is missing
+        self._command = pdfkit.PDFKit('', 'string', options=_WKHTMLTOPDF_OPTIONS,
+                                      configuration=configuration).command()
+        self._spares = threading.local()
+
+    def _spawn(self) -> subprocess.Popen:
+        return subprocess.Popen(self._command, stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def warm(self):
+        self.release()
+        self._spares.process = self._spawn()
+
+    def release(self):
+        process = getattr(self._spares, 'process', None)
+        self._spares.process = None
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.communicate()
+
+    def _take_process(self) -> subprocess.Popen:
+        """This thread's spare process, or a new one if there is none or it died"""
+        process = getattr(self._spares, 'process', None)
+        self._spares.process = None
+        if process is None or process.poll() is not None:
+            return self._spawn()
+        return process
+
+    def render(self, html: str, timeout: float) -> bytes:
+        process = self._take_process()
+        try:
+            stdout, stderr = process.communicate(html.encode('utf-8'), timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise RenderError(f"wkhtmltopdf timed out after {timeout}s")
+        finally:
+            # Start the next job's process while this result is handed back
+            try:
+                self.warm()
+            except OSError as e:
+                print(f"Could not start a spare wkhtmltopdf process: {e}")
+        if process.returncode != 0 or not stdout.startswith(b'%PDF'):
+            error = stderr.decode('utf-8', 'replace').strip()
+            raise RenderError(f"wkhtmltopdf exited with {process.returncode}: {error[:500]}")
+        return stdout
+
+class _TextExtractor(HTMLParser):
+    """Flattens report HTML into styled text blocks (title, heading, bullet, body)"""
+
+    _BLOCK_TAGS = {'p', 'div', 'li', 'h1', 'h2', 'h3', 'br', 'ul', 'tr'}
+
+    def __init__(self):
+        super().__init__()
+        self.blocks = []
+        self._text = []
+        self._style = 'body'
+        self._skip = 0
+
+    def _flush(self):
+        text = ' '.join(''.join(self._text).split())
+        if text:
+            self.blocks.append((self._style, text))
+        self._text = []
+        self._style = 'body'
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('style', 'script', 'title', 'head'):
+            self._skip += 1
+        elif tag in self._BLOCK_TAGS:
+            self._flush()
+            if tag == 'h1':
+                self._style = 'title'
+            elif tag == 'li':
+                self._style = 'bullet'
+            elif 'section-title' in (dict(attrs).get('class') or ''):
+                self._style = 'heading'
+
+    def handle_endtag(self, tag):
+        if tag in ('style', 'script', 'title', 'head'):
+            self._skip = max(0, self._skip - 1)
+        elif tag in self._BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+class TextPDFBackend(PDFBackend):
+    """Pure-Python fallback: lays the report out as paginated text with the PDF base fonts
+
+    Keeps headings, bullets and paragraphs but not CSS styling. The base
+    fonts only cover cp1252, so documents with other scripts (Hindi,
+    Chinese, Japanese, ...) raise RenderError and are served as HTML.
+    """
+
+    name = 'text'
+
+    PAGE_WIDTH, PAGE_HEIGHT, MARGIN = 595, 842, 54
+    # (font resource, size, leading, wrap width in characters) per block style
+    STYLES = {
+        'title': ('F2', 16, 22, 60),
+        'heading': ('F2', 12, 20, 78),
+        'bullet': ('F1', 10, 14, 92),
+        'body': ('F1', 10, 14, 95),
+    }
+
+    def render(self, html: str, timeout: float) -> bytes:
+        parser = _TextExtractor()
+        parser.feed(html)
+        parser.close()
+        for _, text in parser.blocks:
+            try:
+                text.encode('cp1252')
+            except UnicodeEncodeError as e:
+                raise RenderError(f"Text renderer cannot draw {text[e.start:e.end]!r}, it only supports cp1252")
+        return self._build_pdf(self._layout(parser.blocks))
+
+    def _layout(self, blocks: List[Tuple[str, str]]) -> List[List[Tuple[str, int, int, str]]]:
+        """Wrap blocks into lines and split them into pages of (font, size, y, text)"""
+        pages, lines = [], []
+        y = self.PAGE_HEIGHT - self.MARGIN
+        for style, text in blocks:
+            font, size, leading, width = self.STYLES[style]
+            wrapped = textwrap.wrap(text, width) or ['']
+            if style == 'bullet':
+                wrapped = [('- ' if i == 0 else '  ') + line for i, line in enumerate(wrapped)]
+            if style in ('title', 'heading'):
+                y -= leading // 2
+            for line in wrapped:
+                if y - leading < self.MARGIN:
+                    pages.append(lines)
+                    lines, y = [], self.PAGE_HEIGHT - self.MARGIN
+                y -= leading
+                lines.append((font, size, y, line))
+        pages.append(lines)
+        return pages
+
+    @staticmethod
+    def _pdf_string(text: str) -> bytes:
+        raw = text.encode('cp1252')
+        return b'(' + raw.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+    def _build_pdf(self, pages: List[List[Tuple[str, int, int, str]]]) -> bytes:
+        # Object numbers: 1 catalog, 2 page tree, 3-4 fonts, then (page, content) pairs
+        objects = {
+            1: b'<< /Type /Catalog /Pages 2 0 R >>',
+            3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+            4: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+        }
+        page_refs = []
+        for index, lines in enumerate(pages):
+            page_id, content_id = 5 + 2 * index, 6 + 2 * index
+            stream = b'\n'.join(
+                b'BT /%s %d Tf %d %d Td %s Tj ET' % (font.encode(), size, self.MARGIN, y, self._pdf_string(text))
+                for font, size, y, text in lines)
+            objects[content_id] = b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream)
+            objects[page_id] = (b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+                                b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+                                % (self.PAGE_WIDTH, self.PAGE_HEIGHT, content_id))
+            page_refs.append(b'%d 0 R' % page_id)
+        objects[2] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(page_refs), len(page_refs))
+
+        out = [b'%PDF-1.4\n']
+        offsets = []
+        size = len(out[0])
+        for number in range(1, len(objects) + 1):
+            offsets.append(size)
+            chunk = b'%d 0 obj\n%s\nendobj\n' % (number, objects[number])
+            out.append(chunk)
+            size += len(chunk)
+        xref = [b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)]
+        xref.extend(b'%010d 00000 n \n' % offset for offset in offsets)
+        out.extend(xref)
+        out.append(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, size))
+        return b''.join(out)
+
+def create_backend(name: str = PDF_BACKEND) -> PDFBackend:
+    """Backend for name ('wkhtmltopdf', 'text' or 'auto': wkhtmltopdf if installed, else text)"""
+    if name == 'text':
+        return TextPDFBackend()
+    try:
+        return WkhtmltopdfBackend()
+    except OSError as e:
+        if name == 'wkhtmltopdf':
+            raise
+        print(f"wkhtmltopdf not available, using the built-in text PDF renderer: {e}")
+        return TextPDFBackend()
+
+class RenderPool:
+    """Fixed set of renderer threads fed from a bounded queue
+
+    Concurrent reports share the workers instead of each starting a
+    renderer. A full queue rejects new work after queue_timeout seconds. A
+    job whose primary backend fails or times out is rendered once more
+    with the fallback backend, and a worker thread that dies is replaced.
+    """
+
+    def __init__(self, backend: PDFBackend, workers: int = 2, queue_size: int = 16,
+                 timeout: float = 60, fallback: Optional[PDFBackend] = None):
+        self.backend = backend
+        self.fallback = fallback
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._workers = []
+        self._closed = False
+        self.rendered = 0
+        self.failures = 0
+        self.fallbacks = 0
+        self.restarts = 0
+        for _ in range(workers):
+            self._start_worker()
+
+    def _start_worker(self):
+        worker = threading.Thread(target=self._work, name="pdf-renderer", daemon=True)
+        with self._lock:
+            self._workers.append(worker)
+        worker.start()
+
+    @staticmethod
+    def _warm(backend: PDFBackend):
+        try:
+            backend.warm()
+        except Exception as e:
+            # Not fatal: render() starts a process itself when no spare is ready
+            print(f"Could not pre-warm the {backend.name} renderer: {e}")
+
+    def _render(self, html: str) -> bytes:
+        try:
+            return self.backend.render(html, self.timeout)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            if self.fallback is None:
+                raise RenderError(str(e)) from e
+            print(f"{self.backend.name} rendering failed, retrying with {self.fallback.name}: {e}")
+            with self._lock:
+                self.fallbacks += 1
+            return self.fallback.render(html, self.timeout)
+
+    def _work(self):
+        try:
+            self._warm(self.backend)
+            if self.fallback is not None:
+                self._warm(self.fallback)
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    return
+                html, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(self._render(html))
+                    with self._lock:
+                        self.rendered += 1
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            self.backend.release()
+            if self.fallback is not None:
+                self.fallback.release()
+            with self._lock:
+                self._workers.remove(threading.current_thread())
+                replace = not self._closed
+                if replace:
+                    self.restarts += 1
+            if replace:
+                self._start_worker()
+
+    def submit(self, html: str, queue_timeout: float = 5) -> Future:
+        """Queue a document; raises RenderError if the queue stays full for queue_timeout seconds"""
+        if self._closed:
+            raise RenderError("PDF render pool is closed")
+        future = Future()
+        try:
+            self._queue.put((html, future), timeout=queue_timeout)
+        except queue.Full:
+            raise RenderError(f"PDF render queue is full ({self._queue.maxsize} waiting)")
+        return future
+
+    def render(self, html: str) -> bytes:
+        """Render a document on the pool and wait for the PDF bytes"""
+        future = self.submit(html)
+        try:
+            # The worker enforces the render timeout; the extra margin covers queueing
+            return future.result(timeout=self.timeout * 2 + 5)
+        except concurrent.futures.TimeoutError:
+            # Still queued: drop it so nobody renders a PDF that won't be collected
+            future.cancel()
+            raise RenderError(f"PDF rendering did not finish within {self.timeout * 2 + 5}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend name, queue depth and outcome counters"""
+        with self._lock:
+            return {
+                'backend': self.backend.name,
+                'workers': len(self._workers),
+                'queued': self._queue.qsize(),
+                'rendered': self.rendered,
+                'failures': self.failures,
+                'fallbacks': self.fallbacks,
+                'restarts': self.restarts,
+            }
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+        for _ in workers:
+            self._queue.put(None)
+
+_pool: Optional[RenderPool] = None
+_pool_lock = threading.Lock()
+
+def get_render_pool() -> RenderPool:
+    """Get the process-wide PDF render pool (backend chosen on first use)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                backend = create_backend()
+                fallback = TextPDFBackend() if backend.name != 'text' else None
+                _pool = RenderPool(backend, PDF_RENDER_WORKERS, PDF_RENDER_QUEUE_SIZE,
+                                   PDF_RENDER_TIMEOUT_SECONDS, fallback)
+    return _pool
+
+def render_pdf(html: str) -> bytes:
+    """Render an HTML document to PDF bytes on the shared render pool"""
+    return get_render_pool().render(html)
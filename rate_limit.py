@@ -0,0 +1,131 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit breaker is open"""
+
+
+class TokenBucket:
+    """Adaptive token-bucket rate limiter for coroutines on one event loop
+
+    Tokens refill at ``rate`` per second up to ``capacity``; acquire() waits
+    for a token instead of letting the caller through. decrease() halves the
+    rate when upstream reports throttling and increase() walks it back
+    towards the configured ceiling on success (AIMD), so the request rate
+    settles just under the real quota instead of oscillating across it.
+    """
+
+    def __init__(self, rate: float, capacity: float, min_rate: Optional[float] = None):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = None
+        self.acquired = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it (callers are served in FIFO order)"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                self.throttled += 1
+                self.throttled_seconds += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self._tokens -= 1
+            self.acquired += 1
+
+    def decrease(self):
+        """Upstream throttled us: halve the rate (not below min_rate)"""
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def increase(self):
+        """A call succeeded: recover 5% of the ceiling (not above max_rate)"""
+        self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'rate_per_second': round(self.rate, 3),
+            'max_rate_per_second': self.max_rate,
+            'acquired': self.acquired,
+            'throttled': self.throttled,
+            'throttled_seconds': round(self.throttled_seconds, 3),
+        }
+
+
+class CircuitBreaker:
+    """Fails calls fast after repeated upstream failures, then probes for recovery
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    before_call() raises CircuitOpenError for ``reset_timeout`` seconds.
+    Then one trial call is let through (half-open): success closes the
+    breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        if self.state == 'open':
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError("Upstream unavailable, circuit breaker is open")
+            self.state = 'half_open'
+        if self.state == 'half_open':
+            if self._trial_running:
+                self.rejected += 1
+                raise CircuitOpenError("Upstream unavailable, waiting for the trial call")
+            self._trial_running = True
+
+    def record_success(self):
+        self._failures = 0
+        self._trial_running = False
+        self.state = 'closed'
+
+    def record_failure(self):
+        self._failures += 1
+        self._trial_running = False
+        if self.state == 'half_open' or self._failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.opened += 1
+            self.state = 'open'
+            self._opened_at = time.monotonic()
+
+    def record_cancelled(self):
+        """The call was abandoned before upstream answered; let another trial through"""
+        self._trial_running = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'opened': self.opened,
+            'rejected': self.rejected,
+        }
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
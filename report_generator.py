@@ -1,178 +1,139 @@
-import pdfkit
+import csv
+import io
+import json
+import zlib
 from datetime import datetime
-from database import get_health_logs, get_triage_history, get_user_profile
+from typing import Iterator
+from database import (
+    get_health_logs_between, get_triage_history_between, get_user_profile,
+    iter_health_logs, iter_triage_history
+)
 from gemini_client import generate_medical_report
+from pdf_renderer import render_pdf
+from report_templates import render_report_html
 
 def generate_pdf_report(user_id: int, start_date: str, end_date: str) -> str:
     """Generate a PDF medical report"""
     # Get data for the report
     user_profile = get_user_profile(user_id)
-    health_logs = get_health_logs(user_id, 100)  # Get last 100 logs
-    triage_history = get_triage_history(user_id, 20)  # Get last 20 triage results
-
     
-    # Filter logs by date range
-    if start_date and end_date:
-        health_logs = [log for log in health_logs if start_date <= log['date'] <= end_date]
-        triage_history = [triage for triage in triage_history if start_date <= triage['created_at'][:10] <= end_date]
+    # Only rows inside the report period are read (date range applied in SQL)
+    health_logs = get_health_logs_between(user_id, start_date or None, end_date or None)
+    triage_history = get_triage_history_between(user_id, start_date or None, end_date or None)
     
     # Generate report content using AI
     report_content = generate_medical_report(user_profile, health_logs, triage_history)
     
-    # Create HTML template for PDF
-    html_template = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>Medical Health Report</title>
-        <style>
-            body {{ 
-                font-family: Arial, sans-serif; 
-                line-height: 1.6; 
-                margin: 40px;
-                color: #000000;
-                background-color: #ffffff;
-            }}
-            .header {{ text-align: center; margin-bottom: 30px; }}
-            .section {{ margin-bottom: 20px; }}
-            .section-title {{ 
-                font-weight: bold; 
-                font-size: 18px; 
-                margin-bottom: 10px; 
-                border-bottom: 2px solid #333; 
-                padding-bottom: 5px; 
-            }}
-            .patient-info {{ display: grid; grid-template-columns: 1fr 1fr; gap: 10px; }}
-            .summary-box {{ 
-                background-color: #f5f5f5; 
-                padding: 15px; 
-                border-radius: 5px;
-                color: #000000;
-            }}
-            ul {{
-                color: #000000;
-            }}
-            li {{
-                color: #000000;
-                margin-bottom: 8px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Medical Health Report</h1>
-            <p>Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
-            <p>Period: {start_date} to {end_date}</p>
-        </div>
-        
-        <div class="section">
-            <div class="section-title">Patient Information</div>
-            <div class="patient-info">
-                <div><strong>Name:</strong> {user_profile.get('full_name', 'Not provided')}</div>
-                <div><strong>Date of Birth:</strong> {user_profile.get('date_of_birth', 'Not provided')}</div>
-                <div><strong>Blood Group:</strong> {user_profile.get('blood_group', 'Not provided')}</div>
-                <div><strong>Height:</strong> {user_profile.get('height', 'Not provided')}</div>
-                <div><strong>Weight:</strong> {user_profile.get('weight', 'Not provided')}</div>
-                <div><strong>Allergies:</strong> {user_profile.get('allergies', 'None reported')}</div>
-                <div><strong>Medications:</strong> {user_profile.get('medications', 'None reported')}</div>
-                <div><strong>Chronic Conditions:</strong> {user_profile.get('chronic_conditions', 'None reported')}</div>
-            </div>
-        </div>
-        
-        <div class="section">
-            <div class="section-title">Report Summary</div>
-            <div class="summary-box">
-                {report_content.replace(chr(10), '<br>')}
-            </div>
-        </div>
-        
-        <div class="section">
-            <div class="section-title">Recent Health Logs ({len(health_logs)} entries)</div>
-            <ul>
-    """
-    
-    # Add health logs
-    for log in health_logs[-10:]:  # Show last 10 logs
-        html_template += f"""
-                <li>
-                    <strong>{log['date']}:</strong> {log['symptoms']} 
-                    (Severity: {log.get('severity_score', 'N/A')}/100)
-                </li>
-        """
-    
-    html_template += """
-            </ul>
-        </div>
-        
-        <div class="section">
-            <div class="section-title">Recent Triage Assessments</div>
-            <ul>
-    """
-    
-    # Add triage history
-    for triage in triage_history[-5:]:  # Show last 5 triage results
-        html_template += f"""
-                <li>
-                    <strong>{triage['created_at'][:10]}:</strong> {triage['symptoms']} 
-                    -> {triage['triage_level']} ({triage['confidence']} confidence)
-                </li>
-        """
+    # Render the report HTML from the precompiled templates (values escaped)
+    html_template = render_report_html(
+        user_profile, report_content,
+        health_logs[:10],  # Show last 10 logs (rows are newest first)
+        triage_history[:5],  # Show last 5 triage results
+        start_date, end_date,
+        generated_at=datetime.now().strftime('%Y-%m-%d %H:%M'),
+        health_log_count=len(health_logs)
+    )
     
-    html_template += """
-            </ul>
-        </div>
-    </body>
-    </html>
-    """
-    
-    # Generate PDF from HTML
+    # Generate PDF from HTML on the shared renderer pool
     try:
-        # For this to work, you need to install wkhtmltopdf and add it to your PATH
-        # Alternatively, you can use other PDF generation libraries
-        options = {
-            'page-size': 'A4',
-            'margin-top': '0.75in',
-            'margin-right': '0.75in',
-            'margin-bottom': '0.75in',
-            'margin-left': '0.75in',
-            'encoding': "UTF-8",
-            'no-outline': None,
-            'background': None,
-            'enable-local-file-access': None
-        }
-        pdf_data = pdfkit.from_string(html_template, False, options=options)
-        return pdf_data
+        return render_pdf(html_template)
     except Exception as e:
         # Fallback: return HTML content
         print(f"PDF generation error: {e}")
         return html_template
 
+# Export output is handed out in chunks of roughly this many bytes
+_EXPORT_CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv'),
+    'json': ('json', 'application/json'),
+    'ndjson': ('ndjson', 'application/x-ndjson'),
+}
+
+def _csv_chunks(user_id: int) -> Iterator[str]:
+    """CSV export text, quoted by the csv module so commas, quotes and newlines survive"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Type", "Date", "Content", "Score", "Additional Info"])
+
+    def rows():
+        for log in iter_health_logs(user_id):
+            yield ["Health Log", log['date'], log['symptoms'], log['severity_score'], log['notes']]
+        for triage in iter_triage_history(user_id):
+            yield ["Triage", triage['created_at'], triage['symptoms'], "",
+                   f"{triage['triage_level']} ({triage['confidence']})"]
+
+    for row in rows():
+        writer.writerow(row)
+        if buffer.tell() >= _EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def _json_chunks(user_id: int) -> Iterator[str]:
+    """JSON export text ({"health_logs": [...], "triage_history": [...]}), one record per line"""
+    sections = (("health_logs", iter_health_logs(user_id)),
+                ("triage_history", iter_triage_history(user_id)))
+    parts, size = ["{"], 1
+    for index, (name, records) in enumerate(sections):
+        parts.append(f'\n  "{name}": [')
+        separator = "\n    "
+        for record in records:
+            part = separator + json.dumps(record, ensure_ascii=False)
+            parts.append(part)
+            size += len(part)
+            separator = ",\n    "
+            if size >= _EXPORT_CHUNK_SIZE:
+                yield "".join(parts)
+                parts, size = [], 0
+        parts.append("\n  ]" + ("," if index < len(sections) - 1 else ""))
+    parts.append("\n}\n")
+    yield "".join(parts)
+
+def _ndjson_chunks(user_id: int) -> Iterator[str]:
+    """Newline-delimited JSON export text, one typed record per line"""
+    sections = (("health_log", iter_health_logs(user_id)),
+                ("triage", iter_triage_history(user_id)))
+    parts, size = [], 0
+    for record_type, records in sections:
+        for record in records:
+            line = json.dumps({"type": record_type, **record}, ensure_ascii=False) + "\n"
+            parts.append(line)
+            size += len(line)
+            if size >= _EXPORT_CHUNK_SIZE:
+                yield "".join(parts)
+                parts, size = [], 0
+    yield "".join(parts)
+
+def iter_export_chunks(user_id: int, format_type: str = "csv", compress: bool = False) -> Iterator[bytes]:
+    """Stream a user's full health log and triage history as encoded export chunks
+
+    Rows are read through server-side cursors and written out as they
+    arrive, so memory stays bounded however long the history is. With
+    compress=True the output is a gzip stream.
+    """
+    writers = {'csv': _csv_chunks, 'json': _json_chunks, 'ndjson': _ndjson_chunks}
+    if format_type not in writers:
+        raise ValueError(f"Unsupported export format: {format_type}")
+
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31 = gzip container
+    for text in writers[format_type](user_id):
+        data = text.encode('utf-8')
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    if compressor is not None:
+        yield compressor.flush()
+
+def export_health_data_bytes(user_id: int, format_type: str = "csv", compress: bool = False) -> bytes:
+    """Build a complete export as bytes (what st.download_button accepts)"""
+    return b"".join(iter_export_chunks(user_id, format_type, compress))
+
 def export_health_data(user_id: int, format_type: str = "csv") -> str:
     """Export health data in various formats"""
-    health_logs = get_health_logs(user_id, 1000)  # Get up to 1000 logs
-    triage_history = get_triage_history(user_id, 1000)  # Get up to 1000 triage results
-    
-    if format_type == "csv":
-        # Create CSV content
-        csv_content = "Type,Date,Content,Score,Additional Info\n"
-        
-        for log in health_logs:
-            csv_content += f"Health Log,{log['date']},\"{log['symptoms']}\",{log.get('severity_score', '')},\"{log.get('notes', '')}\"\n"
-        
-        for triage in triage_history:
-            csv_content += f"Triage,{triage['created_at']},\"{triage['symptoms']}\",,\"{triage['triage_level']} ({triage['confidence']})\"\n"
-        
-        return csv_content
-    
-    elif format_type == "json":
-        # Create JSON content
-        import json
-        data = {
-            "health_logs": health_logs,
-            "triage_history": triage_history
-        }
-        return json.dumps(data, indent=2)
-    
-    else:
-        return "Unsupported format"
\ No newline at end of file
+    if format_type not in EXPORT_FORMATS:
+        return "Unsupported format"
+    return b"".join(iter_export_chunks(user_id, format_type)).decode('utf-8')
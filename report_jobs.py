@@ -0,0 +1,153 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Union
+
+from config import REPORT_WORKERS, REPORT_JOB_LEASE_SECONDS, REPORT_JOB_RETENTION_DAYS
+from database import get_data_version
+from db_connection import get_connection
+from report_generator import generate_pdf_report
+
+# Report generation waits on Gemini and on the PDF render pool, so a few
+# threads are enough to keep it off the Streamlit request threads.
+_executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report-worker")
+
+_recovered = False
+_recover_lock = threading.Lock()
+
+def _lease_cutoff() -> str:
+    """Jobs started before this are no longer owned by a live worker"""
+    return (datetime.now() - timedelta(seconds=REPORT_JOB_LEASE_SECONDS)).isoformat()
+
+def _recover_jobs():
+    """Requeue jobs whose worker died and prune old finished ones (once per process)
+
+    Other processes may be running jobs right now, so only jobs that have
+    been 'running' longer than the lease are taken back.
+    """
+    global _recovered
+    if _recovered:
+        return
+
+    with _recover_lock:
+        if _recovered:
+            return
+        cutoff = (datetime.now() - timedelta(days=REPORT_JOB_RETENTION_DAYS)).isoformat()
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("DELETE FROM report_jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                     (cutoff,))
+            c.execute('''UPDATE report_jobs SET status = 'queued', started_at = NULL
+                         WHERE status = 'running' AND started_at < ?''', (_lease_cutoff(),))
+            c.execute("SELECT id FROM report_jobs WHERE status = 'queued' ORDER BY created_at")
+            pending = [row[0] for row in c.fetchall()]
+        _recovered = True
+
+    for job_id in pending:
+        _executor.submit(_run_job, job_id)
+
+def _run_job(job_id: int) -> None:
+    """Claim a queued job, generate its report and store the output
+
+    Any failure, including a database error, marks the job failed so the
+    page polling it stops waiting.
+    """
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            # Conditional claim so a job is only ever run by one worker
+            c.execute('''UPDATE report_jobs SET status = 'running', started_at = ?
+                         WHERE id = ? AND status = 'queued' ''', (datetime.now().isoformat(), job_id))
+            if c.rowcount == 0:
+                return
+            c.execute('SELECT user_id, start_date, end_date FROM report_jobs WHERE id = ?', (job_id,))
+            user_id, start_date, end_date = c.fetchone()
+
+        report_data = generate_pdf_report(user_id, start_date, end_date)
+        if isinstance(report_data, bytes):
+            result, result_type = report_data, 'pdf'
+        else:
+            result, result_type = report_data.encode('utf-8'), 'html'
+
+        with get_connection() as conn:
+            conn.execute('''UPDATE report_jobs SET status = 'done', result = ?, result_type = ?, finished_at = ?
+                            WHERE id = ?''', (result, result_type, datetime.now().isoformat(), job_id))
+    except Exception as e:
+        print(f"Report job {job_id} failed: {e}")
+        try:
+            with get_connection() as conn:
+                conn.execute('''UPDATE report_jobs SET status = 'failed', error = ?, finished_at = ?
+                                WHERE id = ?''', (str(e), datetime.now().isoformat(), job_id))
+        except Exception as e:
+            # Left as it was; a 'running' job is requeued once its lease expires
+            print(f"Could not mark report job {job_id} as failed: {e}")
+
+def submit_report_job(user_id: int, start_date: str, end_date: str) -> int:
+    """Enqueue a report and return its job ID
+
+    Requests for the same user, date range and data version share one job,
+    so repeated clicks return the existing (possibly finished) report.
+    A failed job, or one stuck 'running' past its lease, is retried.
+    """
+    _recover_jobs()
+    data_version = get_data_version(user_id)
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('''INSERT OR IGNORE INTO report_jobs
+                     (user_id, start_date, end_date, data_version, status, created_at)
+                     VALUES (?, ?, ?, ?, 'queued', ?)''',
+                 (user_id, start_date, end_date, data_version, datetime.now().isoformat()))
+        created = c.rowcount > 0
+        c.execute('''SELECT id, status, started_at FROM report_jobs
+                     WHERE user_id = ? AND start_date = ? AND end_date = ? AND data_version = ?''',
+                 (user_id, start_date, end_date, data_version))
+        job_id, status, started_at = c.fetchone()
+
+        # Retry failed jobs and jobs whose worker has outlived its lease
+        if status == 'failed' or (status == 'running' and started_at < _lease_cutoff()):
+            c.execute('''UPDATE report_jobs SET status = 'queued', error = NULL, started_at = NULL,
+                                finished_at = NULL
+                         WHERE id = ?''', (job_id,))
+            created = True
+
+    if created:
+        _executor.submit(_run_job, job_id)
+    return job_id
+
+def get_report_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """Get a job's status without loading its output"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('''SELECT id, user_id, start_date, end_date, status, result_type, error,
+                            created_at, started_at, finished_at
+                     FROM report_jobs WHERE id = ?''', (job_id,))
+        row = c.fetchone()
+
+    if row:
+        return {
+            'id': row[0],
+            'user_id': row[1],
+            'start_date': row[2],
+            'end_date': row[3],
+            'status': row[4],
+            'result_type': row[5],
+            'error': row[6],
+            'created_at': row[7],
+            'started_at': row[8],
+            'finished_at': row[9]
+        }
+    return None
+
+def get_report_job_result(job_id: int) -> Optional[Union[bytes, str]]:
+    """Get a finished job's PDF bytes (or HTML text if PDF rendering was unavailable)"""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT result, result_type FROM report_jobs WHERE id = ? AND status = 'done'",
+                 (job_id,))
+        row = c.fetchone()
+
+    if row is None:
+        return None
+    result, result_type = row
+    return bytes(result) if result_type == 'pdf' else bytes(result).decode('utf-8')
@@ -0,0 +1,191 @@
+from html import escape
+from itertools import chain, repeat
+from string import Formatter
+from typing import Any, Dict, List, Optional, Sequence
+
+class CompiledTemplate:
+    """A str.format-style template parsed once into literal and field segments
+
+    Fields are HTML-escaped unless marked ``{name:raw}`` for trusted markup.
+    render_rows() fills the template for a whole list of records at once
+    and builds the output with a single join.
+    """
+
+    def __init__(self, source: str):
+        self.literals = []
+        self.fields = []
+        for literal, field, spec, _ in Formatter().parse(source):
+            self.literals.append(literal)
+            if field is not None:
+                self.fields.append((field, spec == 'raw'))
+        if len(self.literals) == len(self.fields):
+            self.literals.append('')
+
+    def render(self, values: Dict[str, Any]) -> str:
+        pieces = [self.literals[0]]
+        for (field, raw), literal in zip(self.fields, self.literals[1:]):
+            value = str(values[field])
+            pieces.append(value if raw else escape(value))
+            pieces.append(literal)
+        return ''.join(pieces)
+
+    def render_rows(self, columns: Dict[str, Sequence[Any]]) -> str:
+        """Render the template once per row of columns ({field: values}) and join the results"""
+        streams = [repeat(self.literals[0])]
+        for (field, raw), literal in zip(self.fields, self.literals[1:]):
+            values = columns[field]
+            streams.append([str(value) if raw else escape(str(value)) for value in values])
+            streams.append(repeat(literal))
+        return ''.join(chain.from_iterable(zip(*streams)))
+
+# Static document head, built once: nothing in it varies between reports
+_REPORT_HEAD = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <title>Medical Health Report</title>
+        <style>
+            body {
+                font-family: Arial, sans-serif;
+                line-height: 1.6;
+                margin: 40px;
+                color: #000000;
+                background-color: #ffffff;
+            }
+            .header { text-align: center; margin-bottom: 30px; }
+            .section { margin-bottom: 20px; }
+            .section-title {
+                font-weight: bold;
+                font-size: 18px;
+                margin-bottom: 10px;
+                border-bottom: 2px solid #333;
+                padding-bottom: 5px;
+            }
+            .patient-info { display: grid; grid-template-columns: 1fr 1fr; gap: 10px; }
+            .summary-box {
+                background-color: #f5f5f5;
+                padding: 15px;
+                border-radius: 5px;
+                color: #000000;
+            }
+            ul {
+                color: #000000;
+            }
+            li {
+                color: #000000;
+                margin-bottom: 8px;
+            }
+        </style>
+    </head>
+    <body>"""
+
+_REPORT_HEADER = CompiledTemplate("""
+        <div class="header">
+            <h1>Medical Health Report</h1>
+            <p>Generated on: {generated_at}</p>
+            <p>Period: {start_date} to {end_date}</p>
+        </div>
+
+        <div class="section">
+            <div class="section-title">Patient Information</div>
+            <div class="patient-info">
+                <div><strong>Name:</strong> {full_name}</div>
+                <div><strong>Date of Birth:</strong> {date_of_birth}</div>
+                <div><strong>Blood Group:</strong> {blood_group}</div>
+                <div><strong>Height:</strong> {height}</div>
+                <div><strong>Weight:</strong> {weight}</div>
+                <div><strong>Allergies:</strong> {allergies}</div>
+                <div><strong>Medications:</strong> {medications}</div>
+                <div><strong>Chronic Conditions:</strong> {chronic_conditions}</div>
+            </div>
+        </div>
+
+        <div class="section">
+            <div class="section-title">Report Summary</div>
+            <div class="summary-box">
+                {summary:raw}
+            </div>
+        </div>
+
+        <div class="section">
+            <div class="section-title">Recent Health Logs ({health_log_count} entries)</div>
+            <ul>
+    """)
+
+_HEALTH_LOG_ITEM = CompiledTemplate("""
+                <li>
+                    <strong>{date}:</strong> {symptoms}
+                    (Severity: {severity_score}/100)
+                </li>
+        """)
+
+_TRIAGE_SECTION = """
+            </ul>
+        </div>
+
+        <div class="section">
+            <div class="section-title">Recent Triage Assessments</div>
+            <ul>
+    """
+
+_TRIAGE_ITEM = CompiledTemplate("""
+                <li>
+                    <strong>{date}:</strong> {symptoms}
+                    -> {triage_level} ({confidence} confidence)
+                </li>
+        """)
+
+_REPORT_FOOT = """
+            </ul>
+        </div>
+    </body>
+    </html>
+    """
+
+# Patient fields shown in the header, with the text used when missing
+_PROFILE_DEFAULTS = {
+    'full_name': 'Not provided',
+    'date_of_birth': 'Not provided',
+    'blood_group': 'Not provided',
+    'height': 'Not provided',
+    'weight': 'Not provided',
+    'allergies': 'None reported',
+    'medications': 'None reported',
+    'chronic_conditions': 'None reported',
+}
+
+def render_report_html(user_profile: Dict[str, Any], report_content: str, health_logs: List[Dict[str, Any]],
+                       triage_history: List[Dict[str, Any]], start_date: str, end_date: str,
+                       generated_at: str, health_log_count: Optional[int] = None) -> str:
+    """Render the medical report HTML; every user- and model-supplied value is escaped
+
+    health_logs and triage_history are the entries to list; health_log_count
+    is the total shown in the section title (defaults to len(health_logs)).
+    """
+    header = {field: user_profile.get(field, default) for field, default in _PROFILE_DEFAULTS.items()}
+    header.update(
+        generated_at=generated_at,
+        start_date=start_date,
+        end_date=end_date,
+        summary=escape(report_content).replace('\n', '<br>'),
+        health_log_count=len(health_logs) if health_log_count is None else health_log_count,
+    )
+
+    return ''.join((
+        _REPORT_HEAD,
+        _REPORT_HEADER.render(header),
+        _HEALTH_LOG_ITEM.render_rows({
+            'date': [log['date'] for log in health_logs],
+            'symptoms': [log['symptoms'] for log in health_logs],
+            'severity_score': [log.get('severity_score', 'N/A') for log in health_logs],
+        }),
+        _TRIAGE_SECTION,
+        _TRIAGE_ITEM.render_rows({
+            'date': [triage['created_at'][:10] for triage in triage_history],
+            'symptoms': [triage['symptoms'] for triage in triage_history],
+            'triage_level': [triage['triage_level'] for triage in triage_history],
+            'confidence': [triage['confidence'] for triage in triage_history],
+        }),
+        _REPORT_FOOT,
+    ))
@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from cache import LRUCache
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry"""
+    return re.sub(r'\s+', ' ', prompt).strip()
+
+
+def make_cache_key(model_name: str, generation_config: Any, prompt: str) -> str:
+    """Content-addressed key for a prompt under a given model and config"""
+    payload = json.dumps({
+        'model': model_name,
+        'config': generation_config,
+        'prompt': normalize_prompt(prompt),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _SQLiteStore:
+    """Persistent cache tier shared between processes through one SQLite file"""
+
+    # Trimming back to max_entries is done every this many writes, not on each one
+    TRIM_INTERVAL = 100
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS response_cache
+                              (key TEXT PRIMARY KEY,
+                               value TEXT NOT NULL,
+                               expires_at REAL,
+                               last_access REAL NOT NULL)''')
+        self._conn.execute('''CREATE INDEX IF NOT EXISTS idx_response_cache_last_access
+                              ON response_cache (last_access)''')
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        """(value, expires_at as a time.time() timestamp or None) for a live entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT value, expires_at FROM response_cache WHERE key = ?',
+                                     (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] <= now:
+                self._conn.execute('DELETE FROM response_cache WHERE key = ?', (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute('UPDATE response_cache SET last_access = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            return row[0], row[1]
+
+    def set(self, key: str, value: str, ttl: Optional[float]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute('''INSERT OR REPLACE INTO response_cache (key, value, expires_at, last_access)
+                                  VALUES (?, ?, ?, ?)''',
+                               (key, value, now + ttl if ttl else None, now))
+            self._writes += 1
+            if self._writes % self.TRIM_INTERVAL == 0:
+                self._conn.execute('DELETE FROM response_cache WHERE expires_at IS NOT NULL AND expires_at <= ?',
+                                   (now,))
+                self._conn.execute('''DELETE FROM response_cache WHERE key IN
+                                      (SELECT key FROM response_cache ORDER BY last_access DESC
+                                       LIMIT -1 OFFSET ?)''', (self.max_entries,))
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM response_cache WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM response_cache')
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM response_cache').fetchone()[0]
+
+
+class ResponseCache:
+    """Two-tier cache for model responses: in-memory LRU in front of optional SQLite"""
+
+    def __init__(self, ttl: Optional[float] = 3600, max_entries: int = 1024,
+                 db_path: Optional[str] = None, db_max_entries: int = 50000):
+        self.ttl = ttl
+        self._memory = LRUCache(max_entries, ttl)
+        self._store = _SQLiteStore(db_path, db_max_entries) if db_path else None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def _record_lookup(self, value: Optional[str], persistent: bool) -> None:
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if persistent:
+                    self.persistent_hits += 1
+
+    def _promote(self, key: str, row: Optional[Tuple[str, Optional[float]]]) -> Optional[str]:
+        """Copy a SQLite hit into memory for only the lifetime it has left"""
+        if row is None:
+            return None
+        value, expires_at = row
+        self._memory.set(key, value, expires_at - time.time() if expires_at is not None else None)
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._memory.get(key)
+        persistent = False
+        if value is None and self._store is not None:
+            value = self._promote(key, self._store.get(key))
+            persistent = value is not None
+        self._record_lookup(value, persistent)
+        return value
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """Like get(), but the SQLite tier is read on a worker thread, off the event loop"""
+        value = self._memory.get(key)
+        persistent = False
+        if value is None and self._store is not None:
+            value = self._promote(key, await asyncio.to_thread(self._store.get, key))
+            persistent = value is not None
+        self._record_lookup(value, persistent)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._memory.set(key, value)
+        if self._store is not None:
+            self._store.set(key, value, self.ttl)
+
+    async def set_async(self, key: str, value: str) -> None:
+        """Like set(), but the SQLite tier is written on a worker thread, off the event loop"""
+        self._memory.set(key, value)
+        if self._store is not None:
+            await asyncio.to_thread(self._store.set, key, value, self.ttl)
+
+    def invalidate(self, key: str) -> None:
+        self._memory.pop(key)
+        if self._store is not None:
+            self._store.delete(key)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self._store is not None:
+            self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for both tiers"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'persistent_hits': self.persistent_hits,
+            'memory_entries': len(self._memory),
+            'memory_evictions': self._memory.evictions,
+            'persistent_entries': len(self._store) if self._store is not None else 0,
+        }
@@ -0,0 +1,135 @@
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator
+
+import bcrypt
+
+from database import rebuild_severity_aggregates, rebuild_streak_summaries
+from db_connection import get_connection
+
+_SYMPTOMS = ["headache", "sore throat", "mild fever", "dry cough", "fatigue", "runny nose",
+             "stomach ache", "back pain", "dizziness", "nausea", "feeling fine", "trouble sleeping"]
+_NOTES = ["", "", "", "Took ibuprofen", "Drank lots of water", "Worked from home", "Went for a walk"]
+_CHAT_LINES = {
+    "user": ["What should I do about my headache?", "Is a mild fever dangerous?",
+             "How much water should I drink when I'm sick?", "I still feel tired today."],
+    "assistant": ["Rest and stay hydrated; see a doctor if it gets worse.",
+                  "A mild fever is usually fine, but watch for anything above 39C.",
+                  "Aim for about two litres a day, more if you have a fever.",
+                  "Fatigue often lasts a few days after a cold. Keep resting."],
+}
+
+# All synthetic accounts share this password (hashed once, it's slow on purpose)
+SYNTHETIC_PASSWORD = "password"
+
+def _batched(rows: Iterator[tuple], size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def generate_synthetic_data(users: int = 100, days: int = 365, checkin_rate: float = 0.8,
+                            extra_log_rate: float = 0.25, triage_rate: float = 0.1,
+                            chat_sessions_per_user: int = 2, messages_per_session: int = 100,
+                            seed: int = 0, batch_size: int = 10000) -> Dict[str, int]:
+    """Fill the configured database with reproducible synthetic users and history
+
+    Each user checks in on roughly checkin_rate of the last `days` days
+    (with streak-like runs and gaps), sometimes logging twice a day, runs a
+    triage on about triage_rate of check-in days and has long chat
+    sessions. The same seed always produces the same rows. Streak
+    summaries and severity aggregates are rebuilt afterwards. Returns the
+    number of rows inserted per table.
+    """
+    rng = random.Random(seed)
+    password_hash = bcrypt.hashpw(SYNTHETIC_PASSWORD.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    first_day = date.today() - timedelta(days=days - 1)
+    now = datetime.now().isoformat()
+    counts = {'users': 0, 'health_logs': 0, 'daily_streaks': 0, 'triage_results': 0,
+              'chat_sessions': 0, 'chat_messages': 0}
+
+    with get_connection() as conn:
+        c = conn.cursor()
+        # ids come from each insert: AUTOINCREMENT never reuses deleted ids, so MAX(id) + 1 isn't safe
+        user_ids = []
+        for i in range(users):
+            c.execute('''INSERT INTO users (email, password_hash, full_name, created_at, last_login)
+                         VALUES (?, ?, ?, ?, ?)''',
+                      (f"synthetic-pending-{i}@example.com", password_hash, "", now, now))
+            user_id = c.lastrowid
+            c.execute('UPDATE users SET email = ?, full_name = ? WHERE id = ?',
+                      (f"synthetic{user_id}@example.com", f"Synthetic User {user_id}", user_id))
+            user_ids.append(user_id)
+        counts['users'] = users
+
+        def daily_rows():
+            """(kind, row) for every check-in, streak day and triage, user by user"""
+            for user_id in user_ids:
+                severity = rng.uniform(10, 60)
+                checked_in = rng.random() < checkin_rate
+                for offset in range(days):
+                    # Runs of check-ins and gaps rather than independent coin flips
+                    if rng.random() < 0.2:
+                        checked_in = rng.random() < checkin_rate
+                    if not checked_in:
+                        continue
+                    day = (first_day + timedelta(days=offset)).isoformat()
+                    severity = min(100.0, max(0.0, severity + rng.gauss(0, 8)))
+                    symptoms = " and ".join(rng.sample(_SYMPTOMS, rng.randint(1, 3)))
+                    for _ in range(2 if rng.random() < extra_log_rate else 1):
+                        created_at = f"{day}T{rng.randint(6, 22):02d}:{rng.randint(0, 59):02d}:00"
+                        yield 'health_logs', (user_id, day, symptoms, round(severity),
+                                              rng.choice(_NOTES), created_at)
+                    yield 'daily_streaks', (user_id, day, f"{day}T08:00:00")
+                    if rng.random() < triage_rate:
+                        level = 'visit-doctor' if severity >= 60 else 'self-monitor'
+                        yield 'triage_results', (user_id, symptoms, level,
+                                                 rng.choice(['Low', 'Medium', 'High']),
+                                                 'Symptoms are consistent with a common illness.',
+                                                 'Rest and monitor your symptoms.', '',
+                                                 f"{day}T12:00:00")
+
+        statements = {
+            'health_logs': '''INSERT INTO health_logs (user_id, date, symptoms, severity_score, notes, created_at)
+                              VALUES (?, ?, ?, ?, ?, ?)''',
+            'daily_streaks': '''INSERT OR IGNORE INTO daily_streaks (user_id, date, completed, created_at)
+                                VALUES (?, ?, 1, ?)''',
+            'triage_results': '''INSERT INTO triage_results
+                                 (user_id, symptoms, triage_level, confidence, reasoning,
+                                  recommended_action, detailed_analysis, created_at)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+        }
+        for batch in _batched(daily_rows(), batch_size):
+            by_table = {}
+            for table, row in batch:
+                by_table.setdefault(table, []).append(row)
+            for table, rows in by_table.items():
+                c.executemany(statements[table], rows)
+                counts[table] += len(rows)
+
+        for user_id in user_ids:
+            for _ in range(chat_sessions_per_user):
+                started = first_day + timedelta(days=rng.randrange(days))
+                c.execute('''INSERT INTO chat_sessions (user_id, session_type, created_at)
+                             VALUES (?, 'general', ?)''', (user_id, f"{started}T18:00:00"))
+                session_id = c.lastrowid
+                counts['chat_sessions'] += 1
+                base = datetime.combine(started, datetime.min.time()) + timedelta(hours=18)
+                for batch in _batched(
+                        ((session_id, role, rng.choice(_CHAT_LINES[role]),
+                          (base + timedelta(seconds=30 * i)).isoformat())
+                         for i, role in ((i, 'user' if i % 2 == 0 else 'assistant')
+                                         for i in range(messages_per_session))), batch_size):
+                    c.executemany('''INSERT INTO chat_messages (session_id, role, content, timestamp)
+                                     VALUES (?, ?, ?, ?)''', batch)
+                    counts['chat_messages'] += len(batch)
+
+        # Derived tables, in the same transaction as the rows they summarize
+        rebuild_streak_summaries()
+        rebuild_severity_aggregates()
+
+    return counts
@@ -0,0 +1,42 @@
+import pytest
+
+import database
+from db_connection import configure_database, get_connection
+from models import init_database
+
+
+@pytest.fixture
+def db(tmp_path):
+    pool = configure_database(str(tmp_path / "health.db"))
+    init_database()
+    yield
+    pool.close()
+
+
+def _health_logs_page_plan(cursor=None, start_date=None):
+    where, params = database._range_filter('date', start_date, None, end_inclusive=True)
+    if cursor is not None:
+        where += ' AND (date, id) < (?, ?)'
+        params += tuple(database._decode_cursor(cursor))
+
+    with get_connection() as conn:
+        rows = conn.execute(f'''EXPLAIN QUERY PLAN
+                                SELECT {database._HEALTH_LOG_COLUMNS}
+                                FROM health_logs
+                                WHERE user_id = ?{where}
+                                ORDER BY date DESC, id DESC
+                                LIMIT ?''', (1,) + params + (31,)).fetchall()
+    return ' | '.join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize("cursor, start_date", [
+    (None, None),
+    (database._encode_cursor('2024-03-01', 42), None),
+    (None, '2024-01-01'),
+    (database._encode_cursor('2024-03-01', 42), '2024-01-01'),
+])
+def test_health_logs_page_uses_keyset_index(db, cursor, start_date):
+    plan = _health_logs_page_plan(cursor, start_date)
+
+    assert 'idx_health_logs_user_date_id' in plan
+    assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+from response_cache import ResponseCache
+
+
+def test_promoted_entry_keeps_remaining_ttl(tmp_path):
+    cache = ResponseCache(ttl=3600, db_path=str(tmp_path / "cache.db"))
+    cache.set("key", "value")
+
+    # Nearly expired in SQLite and not in memory (e.g. written by another process)
+    cache._store._conn.execute('UPDATE response_cache SET expires_at = ?', (time.time() + 0.2,))
+    cache._store._conn.commit()
+    cache._memory.clear()
+
+    assert cache.get("key") == "value"
+    assert cache.stats()['persistent_hits'] == 1
+
+    time.sleep(0.3)
+    assert cache.get("key") is None
+
+
+def test_promoted_entry_without_expiry_uses_memory_ttl(tmp_path):
+    cache = ResponseCache(ttl=None, db_path=str(tmp_path / "cache.db"))
+    cache.set("key", "value")
+    cache._memory.clear()
+
+    assert cache.get("key") == "value"
+    assert cache._memory.get("key") == "value"
+
+
+def test_async_promotion_keeps_remaining_ttl(tmp_path):
+    cache = ResponseCache(ttl=3600, db_path=str(tmp_path / "cache.db"))
+    asyncio.run(cache.set_async("key", "value"))
+    cache._store._conn.execute('UPDATE response_cache SET expires_at = ?', (time.time() + 0.2,))
+    cache._store._conn.commit()
+    cache._memory.clear()
+
+    assert asyncio.run(cache.get_async("key")) == "value"
+    time.sleep(0.3)
+    assert asyncio.run(cache.get_async("key")) is None
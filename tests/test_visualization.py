@@ -0,0 +1,16 @@
+from visualization import create_health_trends_chart
+
+
+def test_trends_hover_labels_days_without_scores():
+    fig = create_health_trends_chart({
+        'date': ['2024-03-01', '2024-03-02', '2024-03-03'],
+        'log_count': [2, 1, 1],
+        'score_count': [2, 0, 1],
+        'score_sum': [12.0, 0.0, 7.0],
+        'score_min': [3, None, 7],
+        'score_max': [9, None, 7],
+    }, max_points=0)
+
+    labels = [row[0] for row in fig.data[0].customdata]
+    assert labels == ['3-9', 'no scores', '7-7']
+    assert 'nan' not in fig.to_json()
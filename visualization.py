@@ -5,16 +5,99 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import uuid  # For generating unique IDs
+from typing import Any, Callable, Dict, Hashable
 
-def create_health_trends_chart(health_logs: list, chart_id: str = None) -> go.Figure:
-    """Create health trends visualization"""
-    if not health_logs:
+from cache import LRUCache
+from config import CHART_MAX_POINTS, FIGURE_CACHE_MAX_ENTRIES
+
+# Chart functions accept either a list of row dicts or the columnar form
+# ({column: list of values}) returned by database queries with columnar=True.
+
+def _row_count(data) -> int:
+    """Number of rows in a list of row dicts or a dict of columns"""
+    if isinstance(data, dict):
+        return len(next(iter(data.values()), []))
+    return len(data) if data else 0
+
+def _column(data, name: str) -> list:
+    """One column of a list of row dicts or a dict of columns"""
+    if isinstance(data, dict):
+        return data[name]
+    return [row[name] for row in data]
+
+# Built figures shared across reruns and sessions. Keys include the user's
+# data version, so a write makes the old entries unreachable and LRU
+# eviction reclaims them; no explicit invalidation is needed.
+_figure_cache = LRUCache(FIGURE_CACHE_MAX_ENTRIES)
+
+def get_cached_figure(key: Hashable, build: Callable[[], Any]) -> Any:
+    """Return the cached figure for key, building (and caching) it on a miss
+
+    build should do the queries as well as the plotting, so a hit skips both.
+    Cached figures are shared and must not be modified by callers.
+    """
+    figure = _figure_cache.get(key)
+    if figure is None:
+        figure = build()
+        _figure_cache.set(key, figure)
+    return figure
+
+def get_figure_cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters for the figure cache"""
+    return _figure_cache.stats()
+
+def _bucket_averages(aggregates: dict) -> np.ndarray:
+    """Mean severity per aggregate bucket (NaN where a bucket has no scores)"""
+    counts = np.asarray(aggregates['score_count'], dtype=float)
+    sums = np.asarray(aggregates['score_sum'], dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+def downsample_minmax(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices of the points to keep so a series fits in max_points
+
+    The series is cut into max_points // 2 equal buckets and the lowest
+    and highest point of each survive, in their original order, so spikes
+    stay visible however far the line is thinned. NaN points are only kept
+    in buckets that have nothing else.
+    """
+    n = len(y)
+    if max_points <= 0 or n <= max_points:
+        return np.arange(n)
+
+    buckets = max(1, max_points // 2)
+    bucket_of = np.arange(n) * buckets // n
+    starts = np.searchsorted(bucket_of, np.arange(buckets))
+
+    # Sorting by (bucket, value) puts each bucket's min first and max last
+    low = np.lexsort((np.where(np.isnan(y), np.inf, y), bucket_of))[starts]
+    high = np.lexsort((np.where(np.isnan(y), -np.inf, y), bucket_of))[np.append(starts[1:], n) - 1]
+    return np.unique(np.concatenate([low, high]))
+
+def _score_range_labels(score_min: np.ndarray, score_max: np.ndarray) -> np.ndarray:
+    """Hover labels like "3-9" per day, or "no scores" where the range is null"""
+    return np.array([f"{low:g}-{high:g}" if not np.isnan(low) else "no scores"
+                     for low, high in zip(score_min, score_max)], dtype=object)
+
+def create_health_trends_chart(daily_aggregates: dict, chart_id: str = None,
+                               max_points: int = CHART_MAX_POINTS) -> go.Figure:
+    """Create health trends visualization from precomputed daily severity aggregates"""
+    if not _row_count(daily_aggregates):
         return create_empty_chart("No health data available", chart_id)
     
-    # Prepare data
-    df = pd.DataFrame(health_logs)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date')
+    # Prepare data: one point per day, already sorted by the query, thinned
+    # to max_points so long histories don't bloat the figure payload
+    averages = _bucket_averages(daily_aggregates)
+    keep = downsample_minmax(averages, max_points)
+    averages = averages[keep]
+    dates = pd.to_datetime(np.asarray(daily_aggregates['date'])[keep])
+    # Days with logs but no scores have a NULL min/max; label them instead
+    # of letting the hover print "nan-nan"
+    ranges = np.column_stack([
+        _score_range_labels(np.asarray(daily_aggregates['score_min'], dtype=float)[keep],
+                            np.asarray(daily_aggregates['score_max'], dtype=float)[keep]),
+        np.asarray(daily_aggregates['log_count'])[keep],
+    ])
     
     # Create figure
     fig = make_subplots(specs=[[{"secondary_y": False}]])
@@ -22,12 +105,15 @@ def create_health_trends_chart(health_logs: list, chart_id: str = None) -> go.Fi
     # Add severity score line
     fig.add_trace(
         go.Scatter(
-            x=df['date'], 
-            y=df['severity_score'],
+            x=dates, 
+            y=averages,
+            customdata=ranges,
             mode='lines+markers',
             name='Severity Score',
             line=dict(color='#1f77b4'),
-            hovertemplate='<b>Date:</b> %{x}<br><b>Score:</b> %{y}<extra></extra>'
+            hovertemplate=('<b>Date:</b> %{x}<br><b>Avg score:</b> %{y:.1f}'
+                           '<br><b>Range:</b> %{customdata[0]}'
+                           ' (%{customdata[1]} logs)<extra></extra>')
         )
     )
     
@@ -81,13 +167,12 @@ def create_streak_visualization(streak_data: dict, chart_id: str = None) -> go.F
 
 def create_triage_distribution_chart(triage_history: list, chart_id: str = None) -> go.Figure:
     """Create chart showing distribution of triage levels"""
-    if not triage_history:
+    if not _row_count(triage_history):
         return create_empty_chart("No triage data available", chart_id)
     
     # Count triage levels
     triage_counts = {}
-    for result in triage_history:
-        level = result['triage_level']
+    for level in _column(triage_history, 'triage_level'):
         triage_counts[level] = triage_counts.get(level, 0) + 1
     
     # Create pie chart
@@ -104,25 +189,17 @@ def create_triage_distribution_chart(triage_history: list, chart_id: str = None)
     
     return fig
 
-def create_daily_patterns_chart(health_logs: list, chart_id: str = None) -> go.Figure:
-    """Create chart showing patterns by time of day"""
-    if not health_logs:
+def create_daily_patterns_chart(hourly_aggregates: dict, chart_id: str = None) -> go.Figure:
+    """Create chart showing patterns by time of day from precomputed hourly aggregates"""
+    if not _row_count(hourly_aggregates):
         return create_empty_chart("No health data available", chart_id)
     
-    # Extract hour from timestamps
-    df = pd.DataFrame(health_logs)
-    df['created_at'] = pd.to_datetime(df['created_at'])
-    df['hour'] = df['created_at'].dt.hour
-    
-    # Group by hour and calculate average severity
-    hourly_avg = df.groupby('hour')['severity_score'].mean().reset_index()
-    
-    # Create bar chart
+    # Create bar chart of the average severity per hour bucket
     fig = go.Figure()
     
     fig.add_trace(go.Bar(
-        x=hourly_avg['hour'],
-        y=hourly_avg['severity_score'],
+        x=hourly_aggregates['hour'],
+        y=_bucket_averages(hourly_aggregates),
         name='Average Severity',
         marker_color='indianred'
     ))